@@ -0,0 +1,108 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""Compiled batch loop for quick_benchmark.py
+
+Mirrors run_pipelined on an already connected, blocking socket: every
+batch is written with writev() straight from the pre-encoded frames and
+its replies are parsed from a private read buffer, all with the GIL
+released. Only the reply types SET and GET produce are understood (simple
+strings, errors, integers and bulk strings). quick_benchmark.py builds it
+through pyximport for single-connection runs and falls back to the pure-Python loop when
+Cython is not installed.
+"""
+
+from cpython.bytes cimport PyBytes_AS_STRING, PyBytes_GET_SIZE
+from libc.stdlib cimport malloc, free
+
+include "scripts/raw_io.pxi"
+
+
+cdef int read_reply(Reader* r, bint is_set) nogil:
+    """1 if the reply means success, 0 if not, -1 if the stream is unusable"""
+    cdef Py_ssize_t n = read_line(r)
+    cdef char* line
+    cdef char kind
+    cdef long length
+    if n < 3:
+        return -1
+    line = r.buf + r.start
+    kind = line[0]
+    r.start += n
+
+    if kind == b'+':
+        return 1 if is_set else 0
+    elif kind == b'-' or kind == b':':
+        return 0
+    elif kind == b'$':
+        length = parse_int(line + 1, n - 3)
+        if length < 0:
+            return 0
+        if not skip(r, length + 2):
+            return -1
+        return 0 if is_set else 1
+    return -1
+
+
+def run_batches(int fd, list frames, Py_ssize_t pipeline, bint is_set, long long[::1] out):
+    """Send `frames` on `fd` in pipelined batches of `pipeline`
+
+    Like run_pipelined, a command's latency (ns) is its batch's round trip
+    divided by the batch size; one value per successful command is stored
+    in `out`, which must hold len(frames) values. Returns the number stored.
+    The loop stops at the first write failure or unparsable reply.
+    """
+    cdef Py_ssize_t n = len(frames)
+    cdef char** frame_ptr = <char**>malloc(n * sizeof(char*))
+    cdef Py_ssize_t* frame_len = <Py_ssize_t*>malloc(n * sizeof(Py_ssize_t))
+    cdef iovec* iov = <iovec*>malloc(pipeline * sizeof(iovec))
+    cdef Reader r
+    cdef Py_ssize_t i, start, end, ok
+    cdef Py_ssize_t done = 0
+    cdef int status = 0
+    cdef long long t0, per_op
+
+    r.fd = fd
+    r.buf = <char*>malloc(BUF_SIZE)
+    r.start = r.end = 0
+    try:
+        if pipeline <= 0:
+            raise ValueError("pipeline must be positive")
+        if frame_ptr == NULL or frame_len == NULL or iov == NULL or r.buf == NULL:
+            raise MemoryError()
+        for i in range(n):
+            frame_ptr[i] = PyBytes_AS_STRING(frames[i])
+            frame_len[i] = PyBytes_GET_SIZE(frames[i])
+
+        with nogil:
+            start = 0
+            while start < n:
+                end = start + pipeline if start + pipeline < n else n
+                for i in range(start, end):
+                    iov[i - start].iov_base = frame_ptr[i]
+                    iov[i - start].iov_len = frame_len[i]
+
+                t0 = now_ns()
+                if not send_all(fd, iov, <int>(end - start)):
+                    break
+
+                ok = 0
+                for i in range(start, end):
+                    status = read_reply(&r, is_set)
+                    if status < 0:
+                        break
+                    ok += status
+                if status < 0:
+                    # Connection lost or out of sync: the rest cannot succeed
+                    break
+
+                per_op = (now_ns() - t0) // (end - start)
+                for i in range(done, done + ok):
+                    out[i] = per_op
+                done += ok
+                start = end
+    finally:
+        free(frame_ptr)
+        free(frame_len)
+        free(iov)
+        free(r.buf)
+
+    return done
@@ -8,156 +8,509 @@ Only performs basic comparison, does not create graphs.
 
 Usage:
     python3 quick_benchmark.py
+    python3 quick_benchmark.py --nagle    # leave Nagle's algorithm on
+    python3 quick_benchmark.py -n 1000000 -c 50 -P 16 --uvloop
+    python3 quick_benchmark.py --host 10.0.0.5 --ignix-port 7380 --warmup 5000
+
+For reproducible numbers pin the server and the client to separate cores
+(the script prints matching taskset commands).
+
+With Cython installed (pip install cython) single-connection runs use the
+compiled batch loop in quick_batch.pyx, built the first time one needs it.
 """
 
+import argparse
+import asyncio
+import os
 import socket
+import struct
+import sys
 import time
-import statistics
-from typing import List, Tuple
+from array import array
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+# The loader for the optional .pyx modules is shared with the scripts/ benchmarks
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from pyx_loader import load_pyx_attr
+
+# Commands sent per write in benchmark_server
+PIPELINE = 100
+# Batches with at least this many frames are gather-written with sendmsg
+SENDMSG_MIN_FRAMES = 64
+IOV_MAX = 1024
+# Linux-only: hold the segment back until a send without the flag
+MSG_MORE = getattr(socket, 'MSG_MORE', 0)
+SOCKET_BUFFER_SIZE = 1 << 20
+# Latency percentiles reported per phase, as redis-benchmark does
+PERCENTILES = (50, 99, 99.9)
+KEY_TEMPLATE = b"bench_key_%d"
+VALUE_TEMPLATE = b"test_value_%d_" + b"x" * 50
+# TCP_QUICKACK is Linux-only and one-shot, so it is re-armed after every recv
+TCP_QUICKACK = getattr(socket, 'TCP_QUICKACK', None)
+
+# Optional compiled batch loop (quick_batch.pyx), loaded by load_quick_batch
+run_batches = None
+
+
+@lru_cache(maxsize=1024)
+def _header(kind: bytes, n: int) -> bytes:
+    """RESP length header such as b"*3\\r\\n" or b"$5\\r\\n" """
+    return b"%s%d\r\n" % (kind, n)
+
+
+def latency_percentiles(times_ns: array) -> List[float]:
+    """Nearest-rank PERCENTILES of `times_ns`, in ms"""
+    if not times_ns:
+        return [0.0] * len(PERCENTILES)
+    ordered = sorted(times_ns)
+    n = len(ordered)
+    return [ordered[min(n - 1, int(p / 100 * n))] / 1e6 for p in PERCENTILES]
+
+
+def load_quick_batch() -> bool:
+    """Load run_batches from quick_batch.pyx on first use; False without Cython"""
+    global run_batches
+    if run_batches is None:
+        run_batches = load_pyx_attr("quick_batch", "run_batches")
+    return run_batches is not None
 
 
 class SimpleClient:
     """Simple Redis protocol client"""
     
-    def __init__(self, host: str, port: int):
+    def __init__(self, host: str, port: int, nodelay: bool = True):
         self.host = host
         self.port = port
+        self.nodelay = nodelay
         self.sock = None
+        # recv_into writes at _w; bytes in [_r, _w) are received but unparsed
+        self._rbuf = bytearray(1 << 16)
+        self._mv = memoryview(self._rbuf)
+        self._r = 0
+        self._w = 0
     
     def connect(self) -> bool:
         try:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            # Let repeated runs rebind local ports still in TIME_WAIT
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if hasattr(socket, 'SO_REUSEPORT'):
+                self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            # Set before connect() so the receive window is scaled to match
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
             self.sock.settimeout(5.0)
             self.sock.connect((self.host, self.port))
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(self.nodelay))
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
             return True
         except:
             return False
     
     def disconnect(self):
+        self._r = self._w = 0
         if self.sock:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
             self.sock.close()
             self.sock = None
     
-    def _send_command(self, *parts) -> str:
-        if not self.sock:
-            return ""
-        
-        # RESP format
-        cmd = f"*{len(parts)}\r\n"
+    @staticmethod
+    def _fragments(*parts: bytes) -> List[bytes]:
+        # RESP format; arguments are bytes end to end, never str
+        frame = [_header(b'*', len(parts))]
         for part in parts:
-            part_bytes = str(part).encode('utf-8')
-            cmd += f"${len(part_bytes)}\r\n{part_bytes.decode('utf-8')}\r\n"
+            frame += (_header(b'$', len(part)), part, b'\r\n')
+        return frame
+    
+    @classmethod
+    def _encode(cls, *parts: bytes) -> bytes:
+        return b"".join(cls._fragments(*parts))
+    
+    def _sendmsg_all(self, buffers: List[bytes], flags: int = 0):
+        """Gather-write `buffers` with one sendmsg, finishing a partial write with sendall"""
+        sent = self.sock.sendmsg(buffers, (), flags)
+        if sent < sum(map(len, buffers)):
+            self.sock.sendall(b"".join(buffers)[sent:], flags)
+    
+    def _send_frames(self, frames: List[bytes]):
+        """Write `frames` back to back, gathering large batches with sendmsg"""
+        if len(frames) < SENDMSG_MIN_FRAMES or not hasattr(self.sock, 'sendmsg'):
+            self.sock.sendall(b"".join(frames))
+            return
+        
+        # Batches over IOV_MAX take several sendmsg calls; MSG_MORE on all
+        # but the last lets the kernel coalesce them into full segments
+        for start in range(0, len(frames), IOV_MAX):
+            more = start + IOV_MAX < len(frames)
+            self._sendmsg_all(frames[start:start + IOV_MAX], MSG_MORE if more else 0)
+    
+    def _fill(self):
+        """Receive more bytes after _w, first moving the unparsed tail to offset 0"""
+        if self._r:
+            tail = self._w - self._r
+            self._rbuf[:tail] = self._rbuf[self._r:self._w]
+            self._r, self._w = 0, tail
+        elif self._w == len(self._rbuf):
+            # A single reply outgrew the buffer
+            self._mv.release()
+            self._rbuf.extend(bytes(len(self._rbuf)))
+            self._mv = memoryview(self._rbuf)
         
-        self.sock.sendall(cmd.encode('utf-8'))
+        n = self.sock.recv_into(self._mv[self._w:])
+        if not n:
+            raise ConnectionError("Connection closed")
+        if TCP_QUICKACK is not None:
+            self.sock.setsockopt(socket.IPPROTO_TCP, TCP_QUICKACK, 1)
+        self._w += n
+    
+    def _parse_reply(self) -> Optional[Tuple[bytes, Optional[bytes]]]:
+        """Consume one complete reply from the buffer; None if more bytes are needed"""
+        end = self._rbuf.find(b'\r\n', self._r, self._w)
+        if end < 0:
+            return None
         
-        # Read response
-        response = b""
-        while True:
-            chunk = self.sock.recv(1024)
-            if not chunk:
-                break
-            response += chunk
-            if response.endswith(b'\r\n'):
-                break
+        line = bytes(self._mv[self._r:end])
+        kind = line[:1]
+        if kind == b'$':
+            length = int(line[1:])
+            if length >= 0:
+                # Payload and its \r\n must be buffered before anything is consumed
+                if self._w - end - 2 < length + 2:
+                    return None
+                self._r = end + length + 4
+                return kind, bytes(self._mv[end + 2:end + 2 + length])
+            self._r = end + 2
+            return kind, None
+        self._r = end + 2
+        return kind, line[1:]
+    
+    def _read_reply(self) -> Tuple[bytes, Optional[bytes]]:
+        """Read one RESP reply: (type byte, payload), payload None for nil"""
+        # Only recv when the buffered bytes hold no complete reply
+        reply = self._parse_reply()
+        while reply is None:
+            self._fill()
+            reply = self._parse_reply()
+        return reply
+    
+    def _send_command(self, *parts: bytes) -> Tuple[bytes, Optional[bytes]]:
+        if not self.sock:
+            raise ConnectionError("Not connected")
         
-        return response.decode('utf-8', errors='ignore').strip()
+        # Header, payload and \r\n fragments go out as one iovec, unjoined
+        if hasattr(self.sock, 'sendmsg'):
+            self._sendmsg_all(self._fragments(*parts))
+        else:
+            self.sock.sendall(self._encode(*parts))
+        return self._read_reply()
     
-    def set(self, key: str, value: str) -> bool:
+    def pipeline(self, cmds: List[Tuple[bytes, ...]]) -> List[Tuple[bytes, Optional[bytes]]]:
+        """Send all commands in one write, then read their replies in order"""
+        if not self.sock:
+            raise ConnectionError("Not connected")
+        
+        self._send_frames([self._encode(*cmd) for cmd in cmds])
+        return [self._read_reply() for _ in cmds]
+    
+    def set(self, key: bytes, value: bytes) -> bool:
         try:
-            response = self._send_command("SET", key, value)
-            return "OK" in response
+            return self._send_command(b"SET", key, value) == (b'+', b"OK")
         except:
             return False
     
-    def get(self, key: str) -> bool:
+    def get(self, key: bytes) -> bool:
         try:
-            response = self._send_command("GET", key)
-            return response and response != "$-1"  # Not null
+            kind, value = self._send_command(b"GET", key)
+            return kind == b'$' and value is not None  # Not null
         except:
             return False
 
 
-def benchmark_server(host: str, port: int, name: str, operations: int = 1000) -> Tuple[float, float, float]:
+def run_pipelined(client: SimpleClient, cmds: List[tuple], pipeline: int,
+                  expected: bytes) -> Tuple[array, int, int]:
+    """
+    Send `cmds` in pipelined batches of `pipeline` commands
+    Returns: (latency in ns of each successful command, errors, wall time in ns)
+    
+    A command's latency is its batch's round trip divided by the batch size.
+    The loop stops at the first connection error or unparsable reply.
     """
-    Server benchmark
+    pc = time.perf_counter_ns
+    times = array('q', [0]) * len(cmds)
+    done = 0
+    
+    wall_start = pc()
+    for start in range(0, len(cmds), pipeline):
+        batch = cmds[start:start + pipeline]
+        t0 = pc()
+        try:
+            replies = client.pipeline(batch)
+        except (OSError, ConnectionError, ValueError):
+            # After a timeout or bad reply the receive buffer is out of step with
+            # the replies still in flight: stop (the rest count as errors) and
+            # reconnect so the next phase starts from an empty buffer
+            client.disconnect()
+            client.connect()
+            break
+        per_op = (pc() - t0) // len(batch)
+        
+        ok = sum(1 for kind, value in replies if kind == expected and value is not None)
+        times[done:done + ok] = array('q', [per_op]) * ok
+        done += ok
+    wall_ns = pc() - wall_start
+    
+    del times[done:]
+    return times, len(cmds) - done, wall_ns
+
+
+def run_pipelined_compiled(client: SimpleClient, cmds: List[tuple], pipeline: int,
+                           expected: bytes) -> Tuple[array, int, int]:
+    """run_pipelined on the compiled loop: frames are encoded up front, then sent and parsed without the GIL"""
+    frames = [client._encode(*cmd) for cmd in cmds]
+    times = array('q', [0]) * len(cmds)
+    
+    # The compiled loop needs a blocking fd; keep the timeout with SO_RCVTIMEO/SO_SNDTIMEO
+    timeout = client.sock.gettimeout()
+    tv = struct.pack('ll', int(timeout or 0), 0)
+    client.sock.settimeout(None)
+    client.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, tv)
+    client.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO, tv)
+    try:
+        wall_start = time.perf_counter_ns()
+        done = run_batches(client.sock.fileno(), frames, pipeline, expected == b'+', times)
+        wall_ns = time.perf_counter_ns() - wall_start
+    finally:
+        client.sock.settimeout(timeout)
+    
+    del times[done:]
+    return times, len(cmds) - done, wall_ns
+
+
+async def read_reply_async(reader: asyncio.StreamReader) -> Tuple[bytes, Optional[bytes]]:
+    """Read one RESP reply: (type byte, payload), payload None for nil"""
+    line = await reader.readuntil(b'\r\n')
+    kind = line[:1]
+    if kind == b'$':
+        length = int(line[1:-2])
+        if length < 0:
+            return kind, None
+        return kind, (await reader.readexactly(length + 2))[:-2]
+    return kind, line[1:-2]
+
+
+async def async_worker(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                       cmds: List[tuple], pipeline: int, expected: bytes) -> array:
+    """Pipelined loop for one connection; returns latencies in ns of successful commands"""
+    pc = time.perf_counter_ns
+    times = array('q')
+    
+    for start in range(0, len(cmds), pipeline):
+        batch = cmds[start:start + pipeline]
+        t0 = pc()
+        writer.write(b"".join([SimpleClient._encode(*cmd) for cmd in batch]))
+        ok = 0
+        for _ in batch:
+            kind, value = await read_reply_async(reader)
+            ok += kind == expected and value is not None
+        times.extend(array('q', [(pc() - t0) // len(batch)]) * ok)
+    
+    return times
+
+
+async def run_concurrent(host: str, port: int, cmds: List[tuple], concurrency: int, pipeline: int,
+                         expected: bytes, nodelay: bool = True) -> Tuple[array, int, int]:
+    """
+    Spread `cmds` over `concurrency` connections, each pipelining `pipeline` commands
+    Returns: (latency in ns of each successful command, errors, wall time in ns)
+    """
+    conns = await asyncio.gather(*[asyncio.open_connection(host, port) for _ in range(concurrency)])
+    for _, writer in conns:
+        sock = writer.get_extra_info('socket')
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(nodelay))
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+    
+    wall_start = time.perf_counter_ns()
+    results = await asyncio.gather(
+        *[async_worker(reader, writer, cmds[i::concurrency], pipeline, expected)
+          for i, (reader, writer) in enumerate(conns)],
+        return_exceptions=True,
+    )
+    wall_ns = time.perf_counter_ns() - wall_start
+    
+    for _, writer in conns:
+        writer.close()
+    
+    times = array('q')
+    for result in results:
+        if not isinstance(result, BaseException):
+            times.extend(result)
+    return times, len(cmds) - len(times), wall_ns
+
+
+def benchmark_server(client: SimpleClient, name: str, operations: int = 1000,
+                     pipeline: int = PIPELINE, concurrency: int = 1,
+                     compiled: bool = True, warmup: Optional[int] = None) -> Tuple[float, float, float]:
+    """
+    Server benchmark on an already connected client
     Returns: (set_ops_per_sec, get_ops_per_sec, success_rate)
+    
+    With concurrency > 1 the commands are spread over that many asyncio connections.
+    A single connection uses the compiled loop when `compiled` is set and it is available.
+    `warmup` SETs (default min(1000, operations // 10)) run before timing starts.
     """
-    client = SimpleClient(host, port)
+    run_sync = run_pipelined_compiled if compiled and run_batches else run_pipelined
     
-    if not client.connect():
-        print(f"❌ {name} ({host}:{port}) connection failed!")
-        return 0, 0, 0
+    if concurrency > 1:
+        def run(cmds, expected):
+            return asyncio.run(run_concurrent(client.host, client.port, cmds, concurrency,
+                                              pipeline, expected, client.nodelay))
+    else:
+        def run(cmds, expected):
+            return run_sync(client, cmds, pipeline, expected)
     
-    print(f"🔄 {name} benchmark starting... ({operations} operations)")
+    print(f"🔄 {name} benchmark starting... "
+          f"({operations} operations, {concurrency} connections, pipeline {pipeline})")
     
-    # SET test
-    set_times = []
-    set_errors = 0
+    # Keys and values are built once, outside the timed phases
+    keys = [KEY_TEMPLATE % i for i in range(operations)]
+    set_cmds = [(b"SET", key, VALUE_TEMPLATE % i) for i, key in enumerate(keys)]
     
-    for i in range(operations):
-        start = time.time()
-        success = client.set(f"bench_key_{i}", f"test_value_{i}_{'x' * 50}")
-        end = time.time()
-        
-        if success:
-            set_times.append(end - start)
-        else:
-            set_errors += 1
+    # Warmup, untimed in the results: lets the server's caches settle and
+    # the TCP window grow past slow-start before measuring
+    if warmup is None:
+        warmup = min(1000, operations // 10)
+    warmup = min(warmup, operations)
+    if warmup:
+        warm_times, _, warm_wall_ns = run_sync(client, set_cmds[:warmup], pipeline, b'+')
+        print(f"   Warmup: {warmup} SETs, {len(warm_times) * 1e9 / warm_wall_ns:.0f} ops/sec")
     
-    # GET test  
-    get_times = []
-    get_errors = 0
+    # SET test
+    set_times, set_errors, set_wall_ns = run(set_cmds, b'+')
     
-    for i in range(operations):
-        start = time.time()
-        success = client.get(f"bench_key_{i}")
-        end = time.time()
-        
-        if success:
-            get_times.append(end - start)
-        else:
-            get_errors += 1
+    # GET test  
+    get_cmds = [(b"GET", key) for key in keys]
+    get_times, get_errors, get_wall_ns = run(get_cmds, b'$')
     
-    client.disconnect()
+    # Wall-clock throughput also counts client overhead between batches
+    set_throughput = len(set_times) * 1e9 / set_wall_ns if set_wall_ns else 0
+    get_throughput = len(get_times) * 1e9 / get_wall_ns if get_wall_ns else 0
     
-    # Calculate statistics
-    set_ops_per_sec = len(set_times) / sum(set_times) if set_times else 0
-    get_ops_per_sec = len(get_times) / sum(get_times) if get_times else 0
+    # Calculate statistics; latencies of concurrent connections overlap,
+    # so their aggregate rate is the wall-clock one
+    if concurrency > 1:
+        set_ops_per_sec, get_ops_per_sec = set_throughput, get_throughput
+    else:
+        set_ops_per_sec = len(set_times) * 1e9 / sum(set_times) if set_times else 0
+        get_ops_per_sec = len(get_times) * 1e9 / sum(get_times) if get_times else 0
     success_rate = (len(set_times) + len(get_times)) / (operations * 2)
     
-    avg_set_latency = statistics.mean(set_times) * 1000 if set_times else 0
-    avg_get_latency = statistics.mean(get_times) * 1000 if get_times else 0
+    set_latency = " / ".join(f"p{p:g} {ms:.3f}" for p, ms in zip(PERCENTILES, latency_percentiles(set_times)))
+    get_latency = " / ".join(f"p{p:g} {ms:.3f}" for p, ms in zip(PERCENTILES, latency_percentiles(get_times)))
     
     print(f"✅ {name} completed!")
-    print(f"   SET: {set_ops_per_sec:.0f} ops/sec, {avg_set_latency:.2f} ms avg")
-    print(f"   GET: {get_ops_per_sec:.0f} ops/sec, {avg_get_latency:.2f} ms avg")
+    print(f"   SET: {set_ops_per_sec:.0f} ops/sec, {set_throughput:.0f} ops/sec wall, {set_latency} ms")
+    print(f"   GET: {get_ops_per_sec:.0f} ops/sec, {get_throughput:.0f} ops/sec wall, {get_latency} ms")
     print(f"   Success: {success_rate*100:.1f}%")
     print()
     
     return set_ops_per_sec, get_ops_per_sec, success_rate
 
 
+def print_tuning_hints():
+    """Print core-pinning commands and warn about kernel limits that skew results"""
+    cpus = os.cpu_count() or 1
+    if cpus >= 2:
+        half = cpus // 2
+        server_cores = "0" if half == 1 else f"0-{half - 1}"
+        client_cores = str(half) if half == cpus - 1 else f"{half}-{cpus - 1}"
+        print("💡 Pin server and client to separate cores for reproducible numbers:")
+        print(f"   taskset -c {server_cores} ./target/release/ignix")
+        print(f"   taskset -c {client_cores} python3 {' '.join(sys.argv)}")
+    else:
+        print("⚠️  Single CPU: client and server share a core, results include scheduling noise")
+    
+    # SO_RCVBUF/SO_SNDBUF requests are silently capped by these sysctls
+    for knob in ("rmem_max", "wmem_max"):
+        try:
+            with open(f"/proc/sys/net/core/{knob}") as f:
+                limit = int(f.read())
+        except (OSError, ValueError):
+            continue
+        if limit < SOCKET_BUFFER_SIZE:
+            print(f"⚠️  net.core.{knob} is {limit}: socket buffers are capped below {SOCKET_BUFFER_SIZE} "
+                  f"(sysctl -w net.core.{knob}={SOCKET_BUFFER_SIZE})")
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Redis vs Ignix Quick Benchmark")
+    nagle = parser.add_mutually_exclusive_group()
+    nagle.add_argument("--nodelay", dest="nodelay", action="store_true", default=True,
+                       help="Set TCP_NODELAY on benchmark connections (default)")
+    nagle.add_argument("--nagle", dest="nodelay", action="store_false",
+                       help="Leave Nagle's algorithm enabled to measure its effect")
+    parser.add_argument("-n", "--operations", type=int, default=100_000,
+                        help="Operations per phase (SET, then GET)")
+    parser.add_argument("-c", "--concurrency", type=int, default=1,
+                        help="Concurrent connections; above 1 they are driven by asyncio "
+                             "(default 1 keeps the compiled single-connection loop)")
+    parser.add_argument("-P", "--pipeline", type=int, default=PIPELINE,
+                        help="Commands sent per pipelined write")
+    parser.add_argument("--warmup", type=int, default=None,
+                        help="Untimed SETs before each server's run (default: min(1000, n / 10))")
+    parser.add_argument("--host", default="localhost",
+                        help="Host running both servers")
+    parser.add_argument("--redis-port", type=int, default=6379, help="Redis port")
+    parser.add_argument("--ignix-port", type=int, default=7379, help="Ignix port")
+    parser.add_argument("--uvloop", action="store_true",
+                        help="Run the asyncio connections on uvloop")
+    parser.add_argument("--no-compiled", dest="compiled", action="store_false",
+                        help="Use the pure-Python loop even when quick_batch.pyx compiles")
+    args = parser.parse_args()
+    for flag, value in (("-n", args.operations), ("-c", args.concurrency), ("-P", args.pipeline)):
+        if value <= 0:
+            parser.error(f"{flag} must be positive")
+    if args.warmup is not None and args.warmup < 0:
+        parser.error("--warmup must not be negative")
+    
     print("🚀 Redis vs Ignix Quick Benchmark")
     print("=" * 40)
+    print(f"TCP_NODELAY: {'on' if args.nodelay else 'off (Nagle)'}")
+    if args.concurrency == 1:
+        compiled = args.compiled and load_quick_batch()
+        print(f"Client loop: {'compiled (quick_batch.pyx)' if compiled else 'pure Python'}")
+    print_tuning_hints()
+    
+    if args.uvloop:
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            print("⚠️  uvloop not installed (pip install uvloop), using the default event loop")
     
     # Server accessibility check
     servers = [
-        ("localhost", 6379, "Redis"),
-        ("localhost", 7379, "Ignix")
+        (args.host, args.redis_port, "Redis"),
+        (args.host, args.ignix_port, "Ignix")
     ]
     
+    # The probe connections are kept open and reused by the benchmarks
     available_servers = []
     for host, port, name in servers:
-        client = SimpleClient(host, port)
+        client = SimpleClient(host, port, args.nodelay)
         if client.connect():
-            client.disconnect()
             print(f"✅ {name} ({host}:{port}) accessible")
-            available_servers.append((host, port, name))
+            available_servers.append((client, name))
         else:
             print(f"❌ {name} ({host}:{port}) not accessible")
     
     if len(available_servers) < 2:
+        for client, _ in available_servers:
+            client.disconnect()
         print("\n⚠️  Both servers must be running!")
         print("   Redis: redis-server")
         print("   Ignix: cargo run --release")
@@ -167,8 +520,10 @@ def main():
     
     # Run benchmarks
     results = []
-    for host, port, name in available_servers:
-        set_ops, get_ops, success_rate = benchmark_server(host, port, name)
+    for client, name in available_servers:
+        set_ops, get_ops, success_rate = benchmark_server(client, name, args.operations, args.pipeline,
+                                                          args.concurrency, args.compiled, args.warmup)
+        client.disconnect()
         results.append((name, set_ops, get_ops, success_rate))
     
     # Compare results
@@ -201,7 +556,7 @@ def main():
                     print(f"📊 Redis is {(1/get_ratio-1)*100:.1f}% faster in GET operations!")
     
     print("\n💡 For detailed benchmark:")
-    print("   python3 benchmark_redis_vs_ignix.py")
+    print("   python3 scripts/basic_benchmark.py")
 
 
 if __name__ == "__main__":
@@ -1,29 +1,61 @@
 #!/usr/bin/env python3
 
 
+import asyncio
+import mmap
+import multiprocessing
 import socket
+import struct
 import time
 import threading
-import statistics
 import json
 import os
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, asdict
 from typing import List, Dict, Any, Tuple
 import argparse
+import importlib.util
 import subprocess
 
+import numpy as np
 
-try:
-    import matplotlib.pyplot as plt
-    import seaborn as sns
-    HAS_PLOTTING = True
-except ImportError:
-    HAS_PLOTTING = False
+from pyx_loader import load_pyx_attr
+
+
+# Plotting libraries are slow to import, so they are only located here and
+# imported by the process that renders the charts (see _load_plotting)
+plt = sns = None
+HAS_PLOTTING = all(importlib.util.find_spec(name) is not None
+                   for name in ("matplotlib", "seaborn"))
+if not HAS_PLOTTING:
     print("⚠️  matplotlib and seaborn not found. Graphs cannot be created.")
     print("   Installation: pip install matplotlib seaborn")
 
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+# Optional compiled RESP parser (resp_parser.pyx), loaded by load_resp_parser
+compiled_read_response = None
+
+
+def load_resp_parser() -> bool:
+    """Load read_response from resp_parser.pyx on first use; False without Cython"""
+    global compiled_read_response
+    if compiled_read_response is None:
+        compiled_read_response = load_pyx_attr("resp_parser", "read_response")
+    return compiled_read_response is not None
+
 
 @dataclass
 class BenchmarkResult:
@@ -44,6 +76,21 @@ class BenchmarkResult:
     success_rate: float
 
 
+def encode_resp(command, *args) -> bytes:
+    """Encode command in RESP format"""
+    # RESP array format: *<count>\r\n$<len>\r\n<data>\r\n...
+    parts = (command, *args)
+    out = [b"*%d\r\n" % len(parts)]
+    
+    for part in parts:
+        part_bytes = part if isinstance(part, (bytes, bytearray)) else str(part).encode('utf-8')
+        out.append(b"$%d\r\n" % len(part_bytes))
+        out.append(part_bytes)
+        out.append(b"\r\n")
+    
+    return b"".join(out)
+
+
 class RedisProtocolClient:
     """Simple client for Redis RESP protocol"""
     
@@ -52,13 +99,24 @@ class RedisProtocolClient:
         self.port = port
         self.timeout = timeout
         self.sock = None
+        self._rfile = None
+        # Reusable scratch buffer for bulk replies, grown on demand. The
+        # client is used by one worker at a time, so sharing it is safe.
+        self._buf = bytearray(65536)
         
     def connect(self) -> bool:
         """Connect to server"""
         try:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            # Reset on close instead of lingering in TIME_WAIT, so high
+            # connection counts don't exhaust local ports between runs
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
             self.sock.settimeout(self.timeout)
             self.sock.connect((self.host, self.port))
+            # Buffered reader: one recv() pulls up to 64 KiB of replies
+            self._rfile = self.sock.makefile('rb', buffering=65536)
             return True
         except Exception as e:
             print(f"❌ {self.host}:{self.port} connection error: {e}")
@@ -66,6 +124,12 @@ class RedisProtocolClient:
     
     def disconnect(self):
         """Close connection"""
+        if self._rfile:
+            try:
+                self._rfile.close()
+            except:
+                pass
+            self._rfile = None
         if self.sock:
             try:
                 self.sock.close()
@@ -73,31 +137,37 @@ class RedisProtocolClient:
                 pass
             self.sock = None
     
-    def _send_command(self, command: str, *args) -> bytes:
+    def _send_command(self, command, *args) -> bytes:
         """Send command in RESP format"""
         if not self.sock:
             raise Exception("No connection")
         
-        # RESP array format: *<count>\r\n$<len>\r\n<data>\r\n...
-        parts = [command] + list(args)
-        resp_cmd = f"*{len(parts)}\r\n"
-        
-        for part in parts:
-            part_bytes = str(part).encode('utf-8')
-            resp_cmd += f"${len(part_bytes)}\r\n{part_bytes.decode('utf-8')}\r\n"
-        
-        self.sock.sendall(resp_cmd.encode('utf-8'))
+        self.sock.sendall(encode_resp(command, *args))
         
         # Read response
         return self._read_response()
     
+    def send_frames(self, frames: List[bytes]):
+        """Send pre-encoded RESP frames in a single write without waiting for replies.
+        
+        The caller is expected to read exactly len(frames) responses
+        with _read_response(), in the same order.
+        """
+        if not self.sock:
+            raise Exception("No connection")
+        
+        self.sock.sendall(b"".join(frames))
+    
     def _read_response(self) -> bytes:
         """Read RESP response"""
         if not self.sock:
             raise Exception("No connection")
         
+        if compiled_read_response is not None:
+            return compiled_read_response(self._rfile, self._buf)
+        
         # Read first character (response type)
-        first_char = self.sock.recv(1)
+        first_char = self._rfile.read(1)
         if not first_char:
             raise Exception("Connection closed")
         
@@ -115,29 +185,32 @@ class RedisProtocolClient:
             length = int(length_line.decode('utf-8'))
             if length == -1:  # Null
                 return b''
-            data = self.sock.recv(length + 2)  # +2 for \r\n
-            return data[:-2]  # Remove \r\n
+            data = self._read_exact(length + 2)  # +2 for \r\n
+            return data[:-2].tobytes()  # Remove \r\n
         else:
             raise Exception(f"Unknown response type: {first_char}")
     
+    def _read_exact(self, n: int) -> memoryview:
+        """Read exactly n bytes into the scratch buffer and return a view of them"""
+        if len(self._buf) < n:
+            self._buf = bytearray(n)
+        mv = memoryview(self._buf)
+        got = 0
+        while got < n:
+            read = self._rfile.readinto(mv[got:n])
+            if not read:
+                raise Exception("Connection closed")
+            got += read
+        return mv[:n]
+    
     def _read_line(self) -> bytes:
         """Read line ending with \\r\\n"""
-        line = b''
-        while True:
-            char = self.sock.recv(1)
-            if not char:
-                raise Exception("Connection closed")
-            if char == b'\r':
-                next_char = self.sock.recv(1)
-                if next_char == b'\n':
-                    break
-                else:
-                    line += char + next_char
-            else:
-                line += char
-        return line
+        line = self._rfile.readline()
+        if not line.endswith(b'\r\n'):
+            raise Exception("Connection closed")
+        return line[:-2]
     
-    def set(self, key: str, value: str) -> bool:
+    def set(self, key, value) -> bool:
         """SET command"""
         try:
             response = self._send_command("SET", key, value)
@@ -145,7 +218,7 @@ class RedisProtocolClient:
         except Exception:
             return False
     
-    def get(self, key: str) -> str:
+    def get(self, key) -> str:
         """GET command"""
         try:
             response = self._send_command("GET", key)
@@ -162,124 +235,596 @@ class RedisProtocolClient:
             return False
 
 
-def check_server_availability(host: str, port: int) -> bool:
-    """Check if server is accessible"""
-    client = RedisProtocolClient(host, port, timeout=2.0)
-    if client.connect():
-        result = client.ping()
+class ConnectionPool:
+    """Pool of warm connections to one server, reused across configurations
+    
+    Idle connections beyond `max_size` are closed on release. Scaling down
+    is damped: after each configuration the pool only shrinks to the largest
+    demand seen over the last `hysteresis` configurations, so alternating
+    small and large configurations do not reopen sockets every time.
+    """
+    
+    def __init__(self, host: str, port: int, max_size: int, hysteresis: int = 3):
+        self.host = host
+        self.port = port
+        self.max_size = max_size
+        self._idle: List[RedisProtocolClient] = []
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._peak = 0
+        self._recent_peaks = deque(maxlen=hysteresis)
+    
+    def acquire(self):
+        """Borrow a connected client, opening a new connection if none is idle"""
+        with self._lock:
+            client = self._idle.pop() if self._idle else None
+            self._in_use += 1
+            self._peak = max(self._peak, self._in_use)
+        
+        if client is None:
+            client = RedisProtocolClient(self.host, self.port)
+            if not client.connect():
+                with self._lock:
+                    self._in_use -= 1
+                return None
+        return client
+    
+    def release(self, client: RedisProtocolClient, healthy: bool = True):
+        """Return a borrowed client; unhealthy or surplus connections are closed"""
+        with self._lock:
+            self._in_use -= 1
+            if healthy and len(self._idle) < self.max_size:
+                self._idle.append(client)
+                return
         client.disconnect()
-        return result
+    
+    def end_round(self):
+        """Close idle connections not needed by recent configurations"""
+        with self._lock:
+            self._recent_peaks.append(self._peak)
+            self._peak = self._in_use
+            keep = min(self.max_size, max(self._recent_peaks))
+            excess = self._idle[keep:]
+            del self._idle[keep:]
+        for client in excess:
+            client.disconnect()
+    
+    def close(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for client in idle:
+            client.disconnect()
+
+
+_pools: Dict[Tuple[str, int], ConnectionPool] = {}
+
+
+def get_pool(host: str, port: int, max_size: int) -> ConnectionPool:
+    """Return the shared connection pool for (host, port)"""
+    pool = _pools.get((host, port))
+    if pool is None:
+        pool = _pools[(host, port)] = ConnectionPool(host, port, max_size)
+    return pool
+
+
+_redis_pools: Dict[Tuple[str, int], Any] = {}
+
+
+def get_redis_pool(host: str, port: int):
+    """Return the shared redis-py connection pool for (host, port)"""
+    pool = _redis_pools.get((host, port))
+    if pool is None:
+        # Ignix speaks RESP2 only; newer redis-py defaults to a RESP3 HELLO handshake.
+        # It does not know CLIENT SETINFO either, which redis-py sends on every new
+        # connection unless the driver info (lib_name/lib_version before 8.x) is None
+        if hasattr(redis, "DriverInfo"):
+            no_setinfo = {"driver_info": None}
+        else:
+            no_setinfo = {"lib_name": None, "lib_version": None}
+        pool = _redis_pools[(host, port)] = redis.ConnectionPool(
+            host=host, port=port, protocol=2, socket_timeout=5.0, socket_connect_timeout=5.0, **no_setinfo)
+    return pool
+
+
+def close_pools():
+    """Close every pooled connection"""
+    for pool in _pools.values():
+        pool.close()
+    _pools.clear()
+    for pool in _redis_pools.values():
+        pool.disconnect()
+    _redis_pools.clear()
+
+
+# Data size currently stored under the test keys, per (host, port)
+_seeded_sizes: Dict[Tuple[str, int], int] = {}
+
+
+def seed_keys(pool: ConnectionPool, data_size: int, set_frames: List[bytes]) -> bool:
+    """Store the test keys for a GET benchmark, unless already seeded at this size
+    
+    All SET frames go out in a single pipelined write, followed by reading
+    every reply, instead of one round trip per key.
+    """
+    server = (pool.host, pool.port)
+    if _seeded_sizes.get(server) == data_size:
+        return True
+    
+    client = pool.acquire()
+    if client is None:
+        return False
+    
+    ok = False
+    try:
+        client.send_frames(set_frames)
+        ok = all([client._read_response() == b'OK' for _ in set_frames])
+    except Exception:
+        pass
+    finally:
+        pool.release(client, healthy=ok)
+    
+    if ok:
+        _seeded_sizes[server] = data_size
+    return ok
+
+
+def check_server_availability(host: str, port: int, attempts: int = 3) -> bool:
+    """Check if server is accessible, retrying with a short timeout"""
+    for attempt in range(attempts):
+        client = RedisProtocolClient(host, port, timeout=0.5)
+        if client.connect():
+            result = client.ping()
+            client.disconnect()
+            if result:
+                return True
+        if attempt < attempts - 1:
+            time.sleep(0.2)
     return False
 
 
-def generate_test_data(size: int) -> str:
-    """Generate test data"""
-    if size <= 10:
-        return "x" * size
-    else:
-        # Use pattern for more realistic data
-        pattern = "abcdefghijklmnopqrstuvwxyz0123456789"
-        repeats = size // len(pattern)
-        remainder = size % len(pattern)
-        return pattern * repeats + pattern[:remainder]
-
-
-def run_operation_batch(host: str, port: int, operation: str, 
-                       keys: List[str], values: List[str], 
-                       batch_size: int) -> Tuple[List[float], int]:
-    """Run a batch of operations"""
-    client = RedisProtocolClient(host, port)
-    latencies = []
+PATTERN_BYTES = b"abcdefghijklmnopqrstuvwxyz0123456789"
+
+# Test values by data size, shared across configurations
+_value_cache: Dict[int, bytes] = {}
+
+
+def make_value(size: int) -> bytes:
+    """Generate test data of `size` bytes (cached per size)"""
+    value = _value_cache.get(size)
+    if value is None:
+        value = _value_cache[size] = (PATTERN_BYTES * (size // len(PATTERN_BYTES) + 1))[:size]
+    return value
+
+
+def run_operation_batch(pool: ConnectionPool, operation: str, 
+                       frames: List[bytes], out: np.ndarray,
+                       pipeline_depth: int = 1) -> int:
+    """Run a batch of operations
+    
+    `frames` holds the pre-encoded RESP request for every key, so the
+    worker only writes bytes and parses replies. Commands are sent in
+    pipelined groups of `pipeline_depth` (a single write followed by
+    reading all replies). Each command's latency is measured from the
+    moment its group was sent until its reply arrived, in integer
+    nanoseconds.
+    
+    One operation is run per element of `out`, and its latency is written
+    in place. `out` is a slice of a preallocated array owned by the caller,
+    so no locking or allocation is needed. Failed operations leave their
+    slot untouched. Returns the number of errors.
+    
+    The connection is borrowed from `pool` and handed back afterwards.
+    """
+    batch_size = len(out)
     errors = 0
     
-    if not client.connect():
-        return [], batch_size  # All operations failed
+    client = pool.acquire()
+    if client is None:
+        return batch_size  # All operations failed
     
     try:
-        for i in range(batch_size):
-            key_idx = i % len(keys)
-            start_time = time.time()
+        num_frames = len(frames)
+        for batch_start in range(0, batch_size, pipeline_depth):
+            batch_end = min(batch_start + pipeline_depth, batch_size)
+            batch = [frames[i % num_frames] for i in range(batch_start, batch_end)]
+            
+            start_ns = time.perf_counter_ns()
+            try:
+                client.send_frames(batch)
+            except Exception:
+                errors += batch_end - batch_start
+                continue
             
+            for i in range(batch_start, batch_end):
+                try:
+                    response = client._read_response()
+                except Exception:
+                    errors += 1
+                    continue
+                latency_ns = time.perf_counter_ns() - start_ns
+                
+                if operation == "SET":
+                    success = response == b'OK'
+                else:  # GET
+                    success = bool(response)
+                
+                if success:
+                    out[i] = latency_ns
+                else:
+                    errors += 1
+    
+    finally:
+        pool.release(client, healthy=errors == 0)
+    
+    return errors
+
+
+def run_redis_py_batch(redis_pool, operation: str,
+                       keys: List[bytes], values: List[bytes], out: np.ndarray,
+                       pipeline_depth: int = 1) -> int:
+    """redis-py counterpart of run_operation_batch
+    
+    Replies are parsed by redis-py, through the hiredis C parser when it is
+    installed. Each group of `pipeline_depth` commands is one non-transactional
+    pipeline, and every command in the group is assigned the group's latency.
+    """
+    batch_size = len(out)
+    errors = 0
+    client = redis.Redis(connection_pool=redis_pool)
+    pipe = client.pipeline(transaction=False)
+    num_keys = len(keys)
+    
+    for batch_start in range(0, batch_size, pipeline_depth):
+        batch_end = min(batch_start + pipeline_depth, batch_size)
+        for i in range(batch_start, batch_end):
+            key_idx = i % num_keys
             if operation == "SET":
-                success = client.set(keys[key_idx], values[key_idx])
+                pipe.set(keys[key_idx], values[key_idx])
             else:  # GET
-                result = client.get(keys[key_idx])
-                success = result is not None
-            
-            end_time = time.time()
-            latency_ms = (end_time - start_time) * 1000
-            
-            if success:
-                latencies.append(latency_ms)
+                pipe.get(keys[key_idx])
+        
+        start_ns = time.perf_counter_ns()
+        try:
+            responses = pipe.execute(raise_on_error=False)
+        except Exception:
+            pipe.reset()
+            errors += batch_end - batch_start
+            continue
+        latency_ns = time.perf_counter_ns() - start_ns
+        
+        # SET must answer OK (True) and GET a value; anything else, such as an
+        # error sent as a simple string, is a failure
+        for i, response in zip(range(batch_start, batch_end), responses):
+            if response is True if operation == "SET" else isinstance(response, bytes):
+                out[i] = latency_ns
             else:
                 errors += 1
     
+    return errors
+
+
+async def read_response_async(reader: asyncio.StreamReader) -> bytes:
+    """Read RESP response from an asyncio stream"""
+    line = await reader.readuntil(b'\r\n')
+    first_char, line = line[:1], line[1:-2]
+    
+    if first_char == b'+' or first_char == b':':  # Simple string / Integer
+        return line
+    elif first_char == b'-':  # Error
+        raise Exception(f"Server error: {line.decode('utf-8')}")
+    elif first_char == b'$':  # Bulk string
+        length = int(line)
+        if length == -1:  # Null
+            return b''
+        data = await reader.readexactly(length + 2)  # +2 for \r\n
+        return data[:-2]  # Remove \r\n
+    else:
+        raise Exception(f"Unknown response type: {first_char}")
+
+
+async def run_batch_async(pool: ConnectionPool, operation: str,
+                          frames: List[bytes], out: np.ndarray,
+                          pipeline_depth: int = 1) -> int:
+    """asyncio counterpart of run_operation_batch
+    
+    Every connection is a task on a single event loop, so thousands of
+    connections can be in flight without an OS thread each. The pooled
+    socket is duplicated for the stream so closing the stream leaves the
+    pooled connection open.
+    """
+    batch_size = len(out)
+    errors = 0
+    
+    client = pool.acquire()
+    if client is None:
+        return batch_size  # All operations failed
+    
+    try:
+        reader, writer = await asyncio.open_connection(sock=client.sock.dup())
+    except Exception as e:
+        print(f"❌ {pool.host}:{pool.port} connection error: {e}")
+        pool.release(client, healthy=False)
+        return batch_size  # All operations failed
+    
+    try:
+        num_frames = len(frames)
+        for batch_start in range(0, batch_size, pipeline_depth):
+            batch_end = min(batch_start + pipeline_depth, batch_size)
+            batch = [frames[i % num_frames] for i in range(batch_start, batch_end)]
+            
+            start_ns = time.perf_counter_ns()
+            try:
+                writer.write(b"".join(batch))
+                await writer.drain()
+            except Exception:
+                errors += batch_end - batch_start
+                continue
+            
+            for i in range(batch_start, batch_end):
+                try:
+                    response = await read_response_async(reader)
+                except Exception:
+                    errors += 1
+                    continue
+                latency_ns = time.perf_counter_ns() - start_ns
+                
+                if operation == "SET":
+                    success = response == b'OK'
+                else:  # GET
+                    success = bool(response)
+                
+                if success:
+                    out[i] = latency_ns
+                else:
+                    errors += 1
+    
     finally:
-        client.disconnect()
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+        pool.release(client, healthy=errors == 0)
     
-    return latencies, errors
+    return errors
+
+
+async def run_connections_async(pool: ConnectionPool, operation: str,
+                                frames: List[bytes], slices: List[np.ndarray],
+                                pipeline_depth: int) -> List[int]:
+    """Run all connections of one configuration concurrently on the event loop"""
+    return await asyncio.gather(*[
+        run_batch_async(pool, operation, frames, out, pipeline_depth)
+        for out in slices
+    ])
+
+
+# (frames, latencies) handed to forked driver processes, per (host, port).
+# Set by the parent right before forking so children inherit it without
+# pickling; keyed by server so --parallel-servers runs do not clash.
+_fork_state: Dict[Tuple[str, int], Tuple[List[bytes], np.ndarray]] = {}
+
+
+def run_process_shard(host: str, port: int, operation: str,
+                      bounds: List[Tuple[int, int]], pipeline_depth: int) -> int:
+    """Entry point of one driver process
+    
+    Runs the connections whose latency slices are given by `bounds` on a
+    private asyncio loop and connection pool. Latencies are written straight
+    into the shared array inherited from the parent. Returns the number of
+    errors.
+    """
+    frames, latencies = _fork_state[(host, port)]
+    pool = ConnectionPool(host, port, len(bounds))
+    try:
+        errors = asyncio.run(run_connections_async(
+            pool, operation, frames,
+            [latencies[start:stop] for start, stop in bounds],
+            pipeline_depth
+        ))
+    finally:
+        pool.close()
+    return sum(errors)
+
+
+# Upper bound on latencies held in memory at once (8 bytes each) when raw
+# latencies are not requested
+ROUND_OPERATIONS = 1_000_000
+
+
+class LatencyHistogram:
+    """Mergeable latency histogram with logarithmic buckets
+    
+    Each power of two is split into BUCKETS_PER_OCTAVE buckets, so
+    percentiles are within ~1% of the exact value while memory stays
+    constant however many latencies are added. Count, sum, min and max are
+    tracked exactly.
+    """
+    BUCKETS_PER_OCTAVE = 64
+    OCTAVES = 48  # Up to 2**48 ns (~3 days)
+    
+    def __init__(self):
+        self.counts = np.zeros(self.BUCKETS_PER_OCTAVE * self.OCTAVES, dtype=np.int64)
+        self.count = 0
+        self.sum_ns = 0
+        self.min_ns = None
+        self.max_ns = None
+    
+    def add(self, latencies_ns: np.ndarray):
+        """Fold an array of latencies (ns) into the histogram"""
+        if len(latencies_ns) == 0:
+            return
+        buckets = (np.log2(np.maximum(latencies_ns, 1)) * self.BUCKETS_PER_OCTAVE).astype(np.int64)
+        np.clip(buckets, 0, len(self.counts) - 1, out=buckets)
+        self.counts += np.bincount(buckets, minlength=len(self.counts))
+        self.count += len(latencies_ns)
+        self.sum_ns += int(latencies_ns.sum())
+        low, high = int(latencies_ns.min()), int(latencies_ns.max())
+        self.min_ns = low if self.min_ns is None else min(self.min_ns, low)
+        self.max_ns = high if self.max_ns is None else max(self.max_ns, high)
+    
+    def mean_ns(self) -> float:
+        return self.sum_ns / self.count if self.count else 0.0
+    
+    def percentiles(self, qs: List[float]) -> List[float]:
+        """Approximate percentiles (ns), clamped to the observed min/max"""
+        cumulative = np.cumsum(self.counts)
+        ranks = np.ceil(np.asarray(qs, dtype=float) / 100 * self.count).clip(1, self.count)
+        buckets = np.searchsorted(cumulative, ranks)
+        # Geometric midpoint of each bucket
+        values = np.exp2((buckets + 0.5) / self.BUCKETS_PER_OCTAVE)
+        return [float(v) for v in np.clip(values, self.min_ns, self.max_ns)]
 
 
 def benchmark_server(host: str, port: int, server_name: str,
                     operation: str, data_size: int, 
-                    concurrent_connections: int, operations_per_connection: int) -> BenchmarkResult:
-    """Run benchmark for a single server"""
+                    concurrent_connections: int, operations_per_connection: int,
+                    pipeline_depth: int = 1, driver: str = "asyncio",
+                    pool_size: int = None, procs: int = None,
+                    client: str = "raw", raw_latencies: bool = False) -> BenchmarkResult:
+    """Run benchmark for a single server
+    
+    Connections come from the shared pool for (host, port), which keeps up
+    to `pool_size` (default: `concurrent_connections`) sockets warm for the
+    next configuration. The "procs" driver instead forks `procs` processes
+    (default: one per CPU), each running its share of the connections on its
+    own asyncio loop, so the client is not bound by a single GIL.
+    
+    With `client="redis"` requests go through redis-py (and hiredis when
+    installed) on the threads driver instead of the built-in RESP client.
+    
+    Statistics are exact unless a connection runs more operations than fit
+    in one round (see ROUND_OPERATIONS); then latencies are summarized in a
+    LatencyHistogram. `raw_latencies=True` always keeps every latency.
+    """
+    if client == "redis":
+        driver = "threads"
     
     print(f"🔄 {server_name} - {operation} benchmark starting...")
     print(f"   Data size: {data_size} bytes")
     print(f"   Concurrent connections: {concurrent_connections}")
     print(f"   Total operations: {concurrent_connections * operations_per_connection}")
+    print(f"   Pipeline depth: {pipeline_depth}")
+    print(f"   Driver: {driver}")
+    print(f"   Client: {client}")
     
-    # Prepare test data
-    test_keys = [f"benchmark_key_{i}" for i in range(1000)]
-    test_values = [generate_test_data(data_size) for _ in range(1000)]
+    # Prepare test data (pre-encoded so the hot path never touches str)
+    test_keys = [f"benchmark_key_{i}".encode('utf-8') for i in range(1000)]
+    # All values share one bytes object; their content is identical anyway
+    test_values = [make_value(data_size)] * 1000
+    
+    # Pre-serialize every request once. RESP encoding cost is deliberately
+    # excluded from the measurement so that only the server is compared.
+    set_frames = [encode_resp(b"SET", k, v) for k, v in zip(test_keys, test_values)]
+    get_frames = [encode_resp(b"GET", k) for k in test_keys]
+    frames = set_frames if operation == "SET" else get_frames
+    
+    pool = get_pool(host, port, pool_size or concurrent_connections)
     
     # If doing GET test, first SET the data
     if operation == "GET":
-        print(f"   📝 Preparing data for GET test...")
-        setup_client = RedisProtocolClient(host, port)
-        if setup_client.connect():
-            for key, value in zip(test_keys, test_values):
-                setup_client.set(key, value)
-            setup_client.disconnect()
-    
-    # Run benchmark
-    start_time = time.time()
-    all_latencies = []
-    total_errors = 0
+        if _seeded_sizes.get((host, port)) != data_size:
+            print(f"   📝 Preparing data for GET test...")
+        seed_keys(pool, data_size, set_frames)
+    elif _seeded_sizes.get((host, port)) != data_size:
+        # This run overwrites the test keys with values of another size
+        _seeded_sizes.pop((host, port), None)
+    
+    # Run benchmark. Every connection owns a contiguous slice of one
+    # preallocated array; -1 marks operations that did not succeed. Unless
+    # raw latencies were requested, the array is capped at ROUND_OPERATIONS
+    # and longer runs are split into rounds folded into a LatencyHistogram.
+    total_operations = concurrent_connections * operations_per_connection
+    round_size = operations_per_connection
+    if not raw_latencies:
+        round_size = min(round_size, max(1, ROUND_OPERATIONS // concurrent_connections))
+    histogram = LatencyHistogram() if round_size < operations_per_connection else None
+    buffer_len = concurrent_connections * round_size
+    
+    if driver == "procs":
+        # Anonymous shared mapping: writes from forked children are visible here
+        shared = mmap.mmap(-1, max(1, buffer_len) * 8)
+        latencies = np.frombuffer(shared, dtype=np.int64, count=buffer_len)
+    else:
+        latencies = np.empty(buffer_len, dtype=np.int64)
     
-    with ThreadPoolExecutor(max_workers=concurrent_connections) as executor:
-        futures = []
+    total_time = 0.0
+    total_errors = 0
+    done = 0
+    while done < operations_per_connection:
+        n = min(round_size, operations_per_connection - done)
+        done += n
+        bounds = [(i * n, (i + 1) * n) for i in range(concurrent_connections)]
+        recorded = latencies[:concurrent_connections * n]
+        recorded.fill(-1)
+        slices = [latencies[start:stop] for start, stop in bounds]
         
-        for _ in range(concurrent_connections):
-            future = executor.submit(
-                run_operation_batch,
-                host, port, operation,
-                test_keys, test_values,
-                operations_per_connection
-            )
-            futures.append(future)
+        start_time = time.perf_counter()
         
-        # Collect results
-        for future in as_completed(futures):
-            latencies, errors = future.result()
-            all_latencies.extend(latencies)
-            total_errors += errors
-    
-    end_time = time.time()
-    total_time = end_time - start_time
-    total_operations = concurrent_connections * operations_per_connection
-    successful_operations = len(all_latencies)
+        if driver == "procs":
+            nprocs = min(procs or os.cpu_count() or 1, concurrent_connections)
+            shards = [bounds[i::nprocs] for i in range(nprocs)]
+            _fork_state[(host, port)] = (frames, latencies)
+            try:
+                with multiprocessing.get_context("fork").Pool(nprocs) as proc_pool:
+                    errors = proc_pool.starmap(
+                        run_process_shard,
+                        [(host, port, operation, shard, pipeline_depth) for shard in shards]
+                    )
+            finally:
+                del _fork_state[(host, port)]
+        elif client == "redis":
+            redis_pool = get_redis_pool(host, port)
+            with ThreadPoolExecutor(max_workers=concurrent_connections) as executor:
+                errors = list(executor.map(
+                    lambda out: run_redis_py_batch(redis_pool, operation, test_keys,
+                                                   test_values, out, pipeline_depth),
+                    slices
+                ))
+        elif driver == "asyncio":
+            errors = asyncio.run(run_connections_async(
+                pool, operation,
+                frames, slices, pipeline_depth
+            ))
+        else:
+            with ThreadPoolExecutor(max_workers=concurrent_connections) as executor:
+                errors = list(executor.map(
+                    lambda out: run_operation_batch(pool, operation,
+                                                    frames, out, pipeline_depth),
+                    slices
+                ))
+        
+        total_time += time.perf_counter() - start_time
+        total_errors += sum(errors)
+        if histogram is not None:
+            histogram.add(recorded[recorded >= 0])
+    
+    pool.end_round()
     
     # Calculate statistics
-    if all_latencies:
-        avg_latency = statistics.mean(all_latencies)
-        min_latency = min(all_latencies)
-        max_latency = max(all_latencies)
-        p95_latency = statistics.quantiles(all_latencies, n=20)[18]  # 95th percentile
-        p99_latency = statistics.quantiles(all_latencies, n=100)[98]  # 99th percentile
+    if histogram is not None:
+        successful_operations = histogram.count
+        if successful_operations:
+            avg_latency = histogram.mean_ns() / 1e6
+            min_latency = histogram.min_ns / 1e6
+            max_latency = histogram.max_ns / 1e6
+            p95_latency, p99_latency = (p / 1e6 for p in histogram.percentiles([95, 99]))
     else:
+        all_latencies = latencies[latencies >= 0]
+        successful_operations = len(all_latencies)
+        if successful_operations:
+            # Latencies are collected in ns; convert to ms once here
+            latencies_ms = all_latencies / 1e6
+            avg_latency = float(latencies_ms.mean())
+            min_latency = float(latencies_ms.min())
+            max_latency = float(latencies_ms.max())
+            p95_latency, p99_latency = (float(p) for p in np.percentile(latencies_ms, [95, 99]))
+    if not successful_operations:
         avg_latency = min_latency = max_latency = p95_latency = p99_latency = 0
+    if driver == "procs":
+        del latencies, slices, recorded
+        shared.close()
     
     ops_per_second = successful_operations / total_time if total_time > 0 else 0
     success_rate = successful_operations / total_operations if total_operations > 0 else 0
@@ -310,6 +855,11 @@ def benchmark_server(host: str, port: int, server_name: str,
     return result
 
 
+def index_results(results: List[BenchmarkResult]) -> Dict[Tuple[str, str, int, int], BenchmarkResult]:
+    """Index results by (server, operation, data size, connections)"""
+    return {(r.server_name, r.operation, r.data_size, r.concurrent_connections): r for r in results}
+
+
 def print_results_table(results: List[BenchmarkResult]):
     """Print results in table format"""
     print("\n" + "="*120)
@@ -334,143 +884,141 @@ def print_results_table(results: List[BenchmarkResult]):
     print("\n🔍 COMPARISON SUMMARY:")
     print("-"*50)
     
-    operations = list(set(r.operation for r in results))
-    data_sizes = list(set(r.data_size for r in results))
+    if not results:
+        return
+    
+    idx = index_results(results)
+    operations = sorted({r.operation for r in results})
+    data_sizes = sorted({r.data_size for r in results})
+    # Compare at the first connection count that was run
+    connections = results[0].concurrent_connections
     
     for operation in operations:
         for data_size in data_sizes:
-            op_results = [r for r in results if r.operation == operation and r.data_size == data_size]
-            if len(op_results) >= 2:
-                redis_result = next((r for r in op_results if r.server_name == "Redis"), None)
-                ignix_result = next((r for r in op_results if r.server_name == "Ignix"), None)
+            redis_result = idx.get(("Redis", operation, data_size, connections))
+            ignix_result = idx.get(("Ignix", operation, data_size, connections))
+            
+            if redis_result and ignix_result:
+                ops_ratio = ignix_result.operations_per_second / redis_result.operations_per_second
+                lat_ratio = redis_result.avg_latency_ms / ignix_result.avg_latency_ms
                 
-                if redis_result and ignix_result:
-                    ops_ratio = ignix_result.operations_per_second / redis_result.operations_per_second
-                    lat_ratio = redis_result.avg_latency_ms / ignix_result.avg_latency_ms
-                    
-                    print(f"\n{operation} ({data_size} bytes):")
-                    print(f"  Throughput: Ignix {ops_ratio:.2f}x Redis")
-                    print(f"  Latency: Ignix {lat_ratio:.2f}x better" if lat_ratio > 1 else f"  Latency: Redis {1/lat_ratio:.2f}x better")
+                print(f"\n{operation} ({data_size} bytes):")
+                print(f"  Throughput: Ignix {ops_ratio:.2f}x Redis")
+                print(f"  Latency: Ignix {lat_ratio:.2f}x better" if lat_ratio > 1 else f"  Latency: Redis {1/lat_ratio:.2f}x better")
+
+
+def _load_plotting() -> bool:
+    """Import matplotlib (non-interactive backend) and seaborn on first use"""
+    global plt, sns
+    if plt is None and HAS_PLOTTING:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+    return plt is not None
+
+
+def _plot_worker(conn, output_dir: str):
+    """Chart process: import plotting libraries while benchmarks run, then
+    render the results received over `conn` (None means nothing to plot)"""
+    _load_plotting()
+    results = conn.recv()
+    conn.close()
+    if results is not None:
+        create_visualizations(results, output_dir)
 
 
 def create_visualizations(results: List[BenchmarkResult], output_dir: str = "benchmark_results"):
     """Create visualization charts"""
-    if not HAS_PLOTTING:
+    if not _load_plotting():
         print("⚠️  Matplotlib not found, cannot create charts.")
         return
     
-    os.makedirs(output_dir, exist_ok=True)
+    if not results:
+        print("⚠️  No benchmark results to plot.")
+        return
     
-    # Style settings
-    plt.style.use('seaborn-v0_8')
-    sns.set_palette("husl")
+    os.makedirs(output_dir, exist_ok=True)
     
-    # 1. Throughput comparison
-    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-    fig.suptitle('Redis vs Ignix Performance Comparison', fontsize=16, fontweight='bold')
+    idx = index_results(results)
+    data_sizes = sorted({r.data_size for r in results})
+    # Charts compare servers at the first connection count that was run
+    connections = results[0].concurrent_connections
     
-    # Operations/second comparison
     operations = ['SET', 'GET']
     servers = ['Redis', 'Ignix']
     
-    for i, operation in enumerate(operations):
-        op_results = [r for r in results if r.operation == operation]
-        data_sizes = sorted(list(set(r.data_size for r in op_results)))
-        
-        redis_ops = []
-        ignix_ops = []
+    def series(server: str, operation: str, field: str) -> np.ndarray:
+        """One metric across data sizes (0 where a config was not run)"""
+        return np.array([getattr(idx[key], field) if key in idx else 0.0
+                         for key in ((server, operation, size, connections) for size in data_sizes)])
+    
+    x = np.arange(len(data_sizes))
+    width = 0.35
+    size_labels = [str(s) for s in data_sizes]
+    
+    # Style settings (scoped to these charts)
+    with plt.style.context('seaborn-v0_8'):
+        sns.set_palette("husl")
         
-        for size in data_sizes:
-            redis_result = next((r for r in op_results if r.server_name == "Redis" and r.data_size == size), None)
-            ignix_result = next((r for r in op_results if r.server_name == "Ignix" and r.data_size == size), None)
-            
-            redis_ops.append(redis_result.operations_per_second if redis_result else 0)
-            ignix_ops.append(ignix_result.operations_per_second if ignix_result else 0)
+        # 1. Throughput and latency comparison
+        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+        fig.suptitle('Redis vs Ignix Performance Comparison', fontsize=16, fontweight='bold')
         
-        x = range(len(data_sizes))
-        width = 0.35
+        panels = [
+            ('operations_per_second', '{} Operations per Second', 'Operations/second'),
+            ('avg_latency_ms', '{} Average Latency', 'Latency (ms)'),
+        ]
+        for row, (field, title, ylabel) in enumerate(panels):
+            for i, operation in enumerate(operations):
+                ax = axes[row, i]
+                ax.bar(x - width/2, series('Redis', operation, field), width, label='Redis', alpha=0.8)
+                ax.bar(x + width/2, series('Ignix', operation, field), width, label='Ignix', alpha=0.8)
+                
+                ax.set_title(title.format(operation))
+                ax.set_xlabel('Data Size (bytes)')
+                ax.set_ylabel(ylabel)
+                ax.set_xticks(x)
+                ax.set_xticklabels(size_labels)
+                ax.legend()
+                ax.grid(True, alpha=0.3)
         
-        axes[0, i].bar([xi - width/2 for xi in x], redis_ops, width, label='Redis', alpha=0.8)
-        axes[0, i].bar([xi + width/2 for xi in x], ignix_ops, width, label='Ignix', alpha=0.8)
+        plt.tight_layout()
+        plt.savefig(f"{output_dir}/redis_vs_ignix_comparison.png", dpi=300, bbox_inches='tight')
+        plt.close()
         
-        axes[0, i].set_title(f'{operation} Operations per Second')
-        axes[0, i].set_xlabel('Data Size (bytes)')
-        axes[0, i].set_ylabel('Operations/second')
-        axes[0, i].set_xticks(x)
-        axes[0, i].set_xticklabels([str(s) for s in data_sizes])
-        axes[0, i].legend()
-        axes[0, i].grid(True, alpha=0.3)
-    
-    # Latency comparison
-    for i, operation in enumerate(operations):
-        op_results = [r for r in results if r.operation == operation]
-        data_sizes = sorted(list(set(r.data_size for r in op_results)))
+        # 2. Performance ratio chart
+        fig, ax = plt.subplots(1, 1, figsize=(12, 8))
         
-        redis_lat = []
-        ignix_lat = []
+        ratios_data = []
+        labels = []
         
-        for size in data_sizes:
-            redis_result = next((r for r in op_results if r.server_name == "Redis" and r.data_size == size), None)
-            ignix_result = next((r for r in op_results if r.server_name == "Ignix" and r.data_size == size), None)
-            
-            redis_lat.append(redis_result.avg_latency_ms if redis_result else 0)
-            ignix_lat.append(ignix_result.avg_latency_ms if ignix_result else 0)
+        for operation in operations:
+            redis_ops = series('Redis', operation, 'operations_per_second')
+            ignix_ops = series('Ignix', operation, 'operations_per_second')
+            # Only sizes where both servers produced a result
+            both = (redis_ops > 0) & (ignix_ops > 0)
+            ratios_data.extend((ignix_ops[both] / redis_ops[both]).tolist())
+            labels.extend(f"{operation}\n{size}B" for size, ok in zip(data_sizes, both) if ok)
         
-        x = range(len(data_sizes))
-        width = 0.35
+        colors = ['green' if r > 1 else 'red' for r in ratios_data]
+        bars = ax.bar(labels, ratios_data, color=colors, alpha=0.7)
         
-        axes[1, i].bar([xi - width/2 for xi in x], redis_lat, width, label='Redis', alpha=0.8)
-        axes[1, i].bar([xi + width/2 for xi in x], ignix_lat, width, label='Ignix', alpha=0.8)
+        ax.axhline(y=1, color='black', linestyle='--', alpha=0.5, label='Equal Performance')
+        ax.set_title('Ignix vs Redis Performance Ratio\n(>1 means Ignix is faster)', fontweight='bold')
+        ax.set_ylabel('Performance Ratio (Ignix/Redis)')
+        ax.set_xlabel('Test Configuration')
+        ax.grid(True, alpha=0.3)
         
-        axes[1, i].set_title(f'{operation} Average Latency')
-        axes[1, i].set_xlabel('Data Size (bytes)')
-        axes[1, i].set_ylabel('Latency (ms)')
-        axes[1, i].set_xticks(x)
-        axes[1, i].set_xticklabels([str(s) for s in data_sizes])
-        axes[1, i].legend()
-        axes[1, i].grid(True, alpha=0.3)
-    
-    plt.tight_layout()
-    plt.savefig(f"{output_dir}/redis_vs_ignix_comparison.png", dpi=300, bbox_inches='tight')
-    plt.close()
-    
-    # 2. Performance ratio grafiği
-    fig, ax = plt.subplots(1, 1, figsize=(12, 8))
-    
-    ratios_data = []
-    labels = []
-    
-    for operation in operations:
-        op_results = [r for r in results if r.operation == operation]
-        data_sizes = sorted(list(set(r.data_size for r in op_results)))
+        # Değerleri bar'ların üstüne yaz
+        for bar, ratio in zip(bars, ratios_data):
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height + 0.01,
+                    f'{ratio:.2f}x', ha='center', va='bottom', fontweight='bold')
         
-        for size in data_sizes:
-            redis_result = next((r for r in op_results if r.server_name == "Redis" and r.data_size == size), None)
-            ignix_result = next((r for r in op_results if r.server_name == "Ignix" and r.data_size == size), None)
-            
-            if redis_result and ignix_result:
-                ratio = ignix_result.operations_per_second / redis_result.operations_per_second
-                ratios_data.append(ratio)
-                labels.append(f"{operation}\n{size}B")
-    
-    colors = ['green' if r > 1 else 'red' for r in ratios_data]
-    bars = ax.bar(labels, ratios_data, color=colors, alpha=0.7)
-    
-    ax.axhline(y=1, color='black', linestyle='--', alpha=0.5, label='Equal Performance')
-    ax.set_title('Ignix vs Redis Performance Ratio\n(>1 means Ignix is faster)', fontweight='bold')
-    ax.set_ylabel('Performance Ratio (Ignix/Redis)')
-    ax.set_xlabel('Test Configuration')
-    ax.grid(True, alpha=0.3)
-    
-    # Değerleri bar'ların üstüne yaz
-    for bar, ratio in zip(bars, ratios_data):
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2., height + 0.01,
-                f'{ratio:.2f}x', ha='center', va='bottom', fontweight='bold')
-    
-    plt.tight_layout()
-    plt.savefig(f"{output_dir}/performance_ratio.png", dpi=300, bbox_inches='tight')
-    plt.close()
+        plt.tight_layout()
+        plt.savefig(f"{output_dir}/performance_ratio.png", dpi=300, bbox_inches='tight')
+        plt.close()
     
     print(f"📊 Charts created: {output_dir}/")
 
@@ -488,6 +1036,19 @@ def save_results_json(results: List[BenchmarkResult], filename: str = "benchmark
     print(f"💾 Results saved: {filename}")
 
 
+def save_results_msgpack(results: List[BenchmarkResult], filename: str = "benchmark_results.msgpack"):
+    """Save results in msgpack format (same layout as the JSON output)"""
+    results_dict = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "results": [asdict(result) for result in results]
+    }
+    
+    with open(filename, 'wb') as f:
+        f.write(msgpack.packb(results_dict))
+    
+    print(f"💾 Results saved: {filename}")
+
+
 def check_prerequisites():
     """Check prerequisites"""
     print("🔍 Checking prerequisites...")
@@ -516,6 +1077,29 @@ def check_prerequisites():
     return True
 
 
+def run_server_grid(host: str, port: int, server_name: str,
+                    operations: List[str], args, pool_size: int) -> List[BenchmarkResult]:
+    """Run every (operation, data size, connections) configuration against one server, serially"""
+    results = []
+    for operation in operations:
+        for data_size in args.data_sizes:
+            for connections in args.connections:
+                try:
+                    result = benchmark_server(
+                        host, port, server_name,
+                        operation, data_size,
+                        connections, args.operations,
+                        max(1, args.pipeline), args.driver,
+                        pool_size, args.procs, args.client,
+                        args.raw_latencies
+                    )
+                    results.append(result)
+                except Exception as e:
+                    print(f"❌ Error: {e}")
+                    continue
+    return results
+
+
 def main():
     """Main benchmark function"""
     parser = argparse.ArgumentParser(description="Redis vs Ignix Performance Benchmark")
@@ -525,6 +1109,25 @@ def main():
                        help="Number of concurrent connections")
     parser.add_argument("--operations", type=int, default=1000,
                        help="Number of operations per connection")
+    parser.add_argument("--pipeline", type=int, default=1,
+                       help="Number of commands sent per pipelined write (1 = no pipelining)")
+    parser.add_argument("--driver", choices=["asyncio", "threads", "procs"], default="asyncio",
+                       help="Client driver: one asyncio task or one OS thread per connection, "
+                            "or several processes each running an asyncio loop")
+    parser.add_argument("--procs", type=int, default=None,
+                       help="Number of driver processes for --driver procs (default: CPU count)")
+    parser.add_argument("--client", choices=["raw", "redis"], default="raw",
+                       help="Request client: built-in RESP client, or redis-py (uses hiredis "
+                            "when installed; always runs on the threads driver)")
+    parser.add_argument("--pool-size", type=int, default=None,
+                       help="Warm connections kept per server across tests (default: max of --connections)")
+    parser.add_argument("--raw-latencies", action="store_true",
+                       help="Keep every latency for exact percentiles (memory grows with "
+                            "--operations); by default large runs use a bounded histogram")
+    parser.add_argument("--parallel-servers", action="store_true",
+                       help="Benchmark Redis and Ignix concurrently (one thread per server)")
+    parser.add_argument("--output-format", choices=["json", "msgpack", "none"], default="json",
+                       help="Results file format (none skips writing results)")
     parser.add_argument("--output-dir", default="benchmark_results",
                        help="Directory to save output files")
     parser.add_argument("--skip-plots", action="store_true",
@@ -535,10 +1138,30 @@ def main():
     print("🚀 Redis vs Ignix Performance Benchmark")
     print("=" * 50)
     
+    if args.client == "redis" and not HAS_REDIS:
+        print("❌ --client redis requires redis-py: pip install redis hiredis")
+        sys.exit(1)
+    
+    if args.output_format == "msgpack" and not HAS_MSGPACK:
+        print("❌ --output-format msgpack requires msgpack: pip install msgpack")
+        sys.exit(1)
+    
     # Prerequisites check
     if not check_prerequisites():
         sys.exit(1)
     
+    # Forked --driver procs workers inherit the loaded parser
+    if args.client == "raw":
+        load_resp_parser()
+    
+    # Start the chart process now so its imports overlap with the benchmarks
+    plot_conn = plot_proc = None
+    if not args.skip_plots and HAS_PLOTTING:
+        plot_conn, worker_conn = multiprocessing.Pipe()
+        plot_proc = multiprocessing.Process(target=_plot_worker,
+                                            args=(worker_conn, args.output_dir), daemon=True)
+        plot_proc.start()
+    
     # Test configuration
     servers = [
         ("localhost", 6379, "Redis"),
@@ -551,42 +1174,73 @@ def main():
     print(f"   Data sizes: {args.data_sizes} bytes")
     print(f"   Concurrent connections: {args.connections}")
     print(f"   Operations per connection: {args.operations}")
+    print(f"   Pipeline depth: {args.pipeline}")
+    print(f"   Driver: {args.driver}")
+    print(f"   Client: {args.client}")
     print(f"   Total number of tests: {len(servers) * len(operations) * len(args.data_sizes) * len(args.connections)}")
     print()
     
     # Run benchmarks
     all_results = []
+    pool_size = args.pool_size or max(args.connections)
     
-    for host, port, server_name in servers:
-        for operation in operations:
-            for data_size in args.data_sizes:
-                for connections in args.connections:
-                    try:
-                        result = benchmark_server(
-                            host, port, server_name,
-                            operation, data_size,
-                            connections, args.operations
-                        )
-                        all_results.append(result)
-                    except KeyboardInterrupt:
-                        print("\n⚠️  Benchmark stopped by user!")
-                        sys.exit(1)
-                    except Exception as e:
-                        print(f"❌ Error: {e}")
-                        continue
+    try:
+        if args.parallel_servers:
+            # Servers are independent, so each gets its own thread; the
+            # configurations for one server still run one after another.
+            server_results = [[] for _ in servers]
+            
+            def run_grid(i, host, port, server_name):
+                server_results[i] = run_server_grid(host, port, server_name,
+                                                    operations, args, pool_size)
+            
+            threads = [threading.Thread(target=run_grid, args=(i, *server), daemon=True)
+                       for i, server in enumerate(servers)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            for results in server_results:
+                all_results.extend(results)
+        else:
+            for host, port, server_name in servers:
+                all_results.extend(run_server_grid(host, port, server_name,
+                                                   operations, args, pool_size))
+    except KeyboardInterrupt:
+        print("\n⚠️  Benchmark stopped by user!")
+        close_pools()
+        if plot_proc:
+            plot_conn.send(None)
+            plot_proc.join()
+        sys.exit(1)
+    
+    close_pools()
+    
+    # Charts render in the background while results are printed and saved
+    if plot_proc:
+        plot_conn.send(all_results)
     
     # Show results
     print_results_table(all_results)
     
     # Save results
-    os.makedirs(args.output_dir, exist_ok=True)
-    save_results_json(all_results, f"{args.output_dir}/benchmark_results.json")
-    
-    # Create charts
-    if not args.skip_plots:
+    if args.output_format != "none":
+        os.makedirs(args.output_dir, exist_ok=True)
+    if args.output_format == "json":
+        save_results_json(all_results, f"{args.output_dir}/benchmark_results.json")
+    elif args.output_format == "msgpack":
+        save_results_msgpack(all_results, f"{args.output_dir}/benchmark_results.msgpack")
+    
+    # Wait for charts
+    if plot_proc:
+        plot_proc.join()
+    elif not args.skip_plots:
         create_visualizations(all_results, args.output_dir)
     
-    print(f"\n🎉 Benchmark completed! Results: {args.output_dir}/")
+    if args.output_format == "none" and (args.skip_plots or not HAS_PLOTTING):
+        print("\n🎉 Benchmark completed!")
+    else:
+        print(f"\n🎉 Benchmark completed! Results: {args.output_dir}/")
 
 
 if __name__ == "__main__":
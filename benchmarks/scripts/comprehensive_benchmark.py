@@ -1,29 +1,56 @@
 #!/usr/bin/env python3
 
+import asyncio
 import socket
 import time
 import threading
-import statistics
 import json
 import os
 import sys
 import random
 import string
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, asdict, field, replace
 from typing import List, Dict, Any, Tuple
 import argparse
+import importlib.util
+import struct
+
+import numpy as np
+
+from pyx_loader import load_pyx_attr
+
+# Plotting libraries are imported on first use (see load_plotting), so runs
+# that never plot, such as --report-only, do not pay for them
+plt = sns = pd = None
+HAS_PLOTTING = all(importlib.util.find_spec(name) is not None
+                   for name in ("matplotlib", "seaborn", "pandas"))
+if not HAS_PLOTTING:
+    print("⚠️  matplotlib, seaborn, or pandas not found. Graphs cannot be created.")
+    print("   Installation: pip install matplotlib seaborn pandas")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 try:
-    import matplotlib.pyplot as plt
-    import seaborn as sns
-    import numpy as np
-    import pandas as pd
-    HAS_PLOTTING = True
+    import uvloop
 except ImportError:
-    HAS_PLOTTING = False
-    print("⚠️  matplotlib, seaborn, numpy, or pandas not found. Graphs cannot be created.")
-    print("   Installation: pip install matplotlib seaborn numpy pandas")
+    uvloop = None
+
+# Optional compiled worker loop (run_worker_fast.pyx), loaded by load_run_worker_fast
+run_worker_fast = None
+
+def load_run_worker_fast() -> bool:
+    """Load run_worker_fast from run_worker_fast.pyx on first use; False without Cython"""
+    global run_worker_fast
+    if run_worker_fast is None:
+        run_worker_fast = load_pyx_attr("run_worker_fast", "run_worker_fast")
+    return run_worker_fast is not None
+
+# Percentiles reported for every result (computed in one pass, see compute_percentiles)
+PERCENTILES = (50, 90, 95, 99, 99.9)
 
 @dataclass
 class BenchmarkConfig:
@@ -35,15 +62,22 @@ class BenchmarkConfig:
     connections: int
     data_size: int
     operation: str
+    pipeline: int = 1 # commands sent per write; replies are read after the write
+    sample_rate: float = 1.0 # fraction of successful ops whose latency is recorded
+    driver: str = "asyncio" # "asyncio": one event loop task per connection, "threads": one thread each,
+                            # "compiled": one thread each running run_worker_fast without the GIL
+    uvloop: bool = False # asyncio driver only: run the event loop on uvloop
 
 @dataclass
 class BenchmarkResult:
     config: BenchmarkConfig
-    latencies: List[float] = field(default_factory=list)
+    latencies: np.ndarray = field(default_factory=lambda: np.empty(0)) # ms, sampled ops only (workers record ns)
     start_time: float = 0.0
     end_time: float = 0.0
     errors: int = 0
+    completed_ops: int = 0 # all successful ops, including those whose latency was not sampled
     throughput_samples: List[Tuple[float, int]] = field(default_factory=list) # (timestamp, ops_count)
+    percentiles: Dict[float, float] = field(default_factory=dict) # filled by compute_percentiles
 
     @property
     def total_time(self):
@@ -51,15 +85,37 @@ class BenchmarkResult:
 
     @property
     def ops_per_sec(self):
-        return len(self.latencies) / self.total_time if self.total_time > 0 else 0
+        return self.completed_ops / self.total_time if self.total_time > 0 else 0
 
     @property
     def avg_latency(self):
-        return statistics.mean(self.latencies) if self.latencies else 0
+        return float(self.latencies.mean()) if len(self.latencies) else 0
+
+    def compute_percentiles(self, ps=PERCENTILES) -> Dict[float, float]:
+        if len(self.latencies):
+            self.percentiles = dict(zip(ps, np.percentile(self.latencies, ps).tolist()))
+        else:
+            self.percentiles = {p: 0.0 for p in ps}
+        return self.percentiles
 
     def percentile(self, p):
-        if not self.latencies: return 0
-        return statistics.quantiles(self.latencies, n=1000)[int(p*10)-1] if len(self.latencies) >= 1000 else statistics.quantiles(self.latencies, n=100)[int(p)-1]
+        if p in self.percentiles: return self.percentiles[p]
+        if not len(self.latencies): return 0
+        return float(np.percentile(self.latencies, p))
+
+def encode_command(*args) -> bytes:
+    buf = bytearray(b'*%d\r\n' % len(args))
+    for arg in args:
+        s = arg if isinstance(arg, (bytes, bytearray)) else str(arg).encode('utf-8')
+        buf += b'$%d\r\n' % len(s)
+        buf += s
+        buf += b'\r\n'
+    return bytes(buf)
+
+def encode_set_header(key: str, value_len: int) -> bytes:
+    # Everything of a SET frame up to the value; the value and CRLF follow
+    k = key.encode('utf-8')
+    return b'*3\r\n$3\r\nSET\r\n$%d\r\n%s\r\n$%d\r\n' % (len(k), k, value_len)
 
 class RedisProtocolClient:
     def __init__(self, host: str, port: int, timeout: float = 5.0):
@@ -67,6 +123,10 @@ class RedisProtocolClient:
         self.port = port
         self.timeout = timeout
         self.sock = None
+        # Replies are parsed from one receive buffer; _rpos is the parse cursor
+        self._rbuf = bytearray()
+        self._rpos = 0
+        self._chunk = memoryview(bytearray(65536))
 
     def connect(self) -> bool:
         try:
@@ -74,6 +134,8 @@ class RedisProtocolClient:
             self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             self.sock.settimeout(self.timeout)
             self.sock.connect((self.host, self.port))
+            self._rbuf.clear()
+            self._rpos = 0
             return True
         except Exception as e:
             # print(f"Connection error: {e}")
@@ -87,41 +149,96 @@ class RedisProtocolClient:
                 pass
             self.sock = None
 
+    def send_parts(self, parts: List[bytes]):
+        # Vectored send: the kernel gathers straight from each buffer, so a
+        # large value is never copied into a joined frame
+        views = [memoryview(p) for p in parts if p]
+        first = 0
+        while first < len(views):
+            sent = self.sock.sendmsg(views[first:first + 512]) # stay below IOV_MAX
+            while first < len(views) and sent >= len(views[first]):
+                sent -= len(views[first])
+                first += 1
+            if sent:
+                views[first] = views[first][sent:]
+
     def _send_command(self, *args) -> bytes:
         if not self.sock: raise Exception("No connection")
         
-        resp = f"*{len(args)}\r\n"
-        for arg in args:
-            s = str(arg).encode('utf-8')
-            resp += f"${len(s)}\r\n"
-            resp += s.decode('utf-8') + "\r\n"
-        
-        self.sock.sendall(resp.encode('utf-8'))
+        self.sock.sendall(encode_command(*args))
         return self._read_response()
 
+    def _recv_more(self):
+        # Drop parsed bytes, then append whatever the socket has (up to 64 KiB)
+        if self._rpos:
+            del self._rbuf[:self._rpos]
+            self._rpos = 0
+        n = self.sock.recv_into(self._chunk)
+        if not n: raise Exception("Connection closed")
+        self._rbuf += self._chunk[:n]
+
+    def _read_line(self) -> bytes:
+        # Next line without its CRLF
+        while True:
+            end = self._rbuf.find(b'\r\n', self._rpos)
+            if end >= 0:
+                line = bytes(self._rbuf[self._rpos:end])
+                self._rpos = end + 2
+                return line
+            self._recv_more()
+
+    def _read_exact(self, n: int) -> bytes:
+        # Next n bytes, plus the CRLF that follows them
+        avail = len(self._rbuf) - self._rpos
+        if avail < n + 2 and n > len(self._chunk):
+            # Large reply: take what is buffered, then receive the rest in place
+            data = bytearray(n + 2)
+            data[:avail] = memoryview(self._rbuf)[self._rpos:]
+            self._rbuf.clear()
+            self._rpos = 0
+            view = memoryview(data)
+            while avail < n + 2:
+                got = self.sock.recv_into(view[avail:])
+                if not got: raise Exception("Connection closed")
+                avail += got
+            return bytes(view[:n])
+        while len(self._rbuf) - self._rpos < n + 2:
+            self._recv_more()
+        data = bytes(self._rbuf[self._rpos:self._rpos + n])
+        self._rpos += n + 2
+        return data
+
     def _read_response(self) -> bytes:
-        f = self.sock.makefile('rb') # Simplified reading for benchmark script
-        line = f.readline()
-        if not line: raise Exception("Connection closed")
-        
-        if line.startswith(b'+'): return line.strip()
-        elif line.startswith(b'-'): raise Exception(line.strip().decode())
-        elif line.startswith(b':'): return line.strip()
-        elif line.startswith(b'$'):
-            length = int(line[1:])
-            if length == -1: return None
-            data = f.read(length)
-            f.read(2) # CRLF
-            return data
-        elif line.startswith(b'*'):
-            count = int(line[1:])
-            res = []
-            for _ in range(count):
-                res.append(self._read_response()) # Recursive for arrays (not used in simple bench)
-            return res
-        return line
-
-    def set(self, key: str, value: str) -> bool:
+        # Iterative parser: open arrays live on an explicit stack of
+        # (items, expected count) instead of in recursive calls
+        stack = []
+        while True:
+            line = self._read_line()
+            kind = line[:1]
+            if kind == b'+' or kind == b':': value = line
+            elif kind == b'-': raise Exception(line.decode())
+            elif kind == b'$':
+                length = int(line[1:])
+                value = None if length == -1 else self._read_exact(length)
+            elif kind == b'*':
+                count = int(line[1:])
+                if count > 0:
+                    stack.append(([], count))
+                    continue
+                value = [] if count == 0 else None
+            else: value = line
+            
+            # Complete every array this value finishes
+            while stack:
+                items, count = stack[-1]
+                items.append(value)
+                if len(items) < count: break
+                stack.pop()
+                value = items
+            else:
+                return value
+
+    def set(self, key: str, value: bytes) -> bool:
         try:
             return self._send_command("SET", key, value) == b'+OK'
         except:
@@ -134,93 +251,251 @@ class RedisProtocolClient:
         except:
             return False
 
-def generate_data(size: int) -> str:
-    return ''.join(random.choices(string.ascii_letters + string.digits, k=size))
+def generate_data(size: int) -> bytes:
+    return bytes(random.choices((string.ascii_letters + string.digits).encode('ascii'), k=size))
+
+def sample_interval(config: BenchmarkConfig) -> int:
+    # Every n-th op has its latency recorded; 0 when sampling is off (sample_rate <= 0)
+    return max(1, round(1 / config.sample_rate)) if config.sample_rate > 0 else 0
 
-def run_worker(config: BenchmarkConfig, keys: List[str], values: List[str]) -> Tuple[List[float], int]:
+def run_worker(config: BenchmarkConfig, heads: List[bytes], tail: bytes) -> Tuple[np.ndarray, int, int]:
+    # Op i sends heads[i % len(heads)] followed by tail (see build_frames)
     client = RedisProtocolClient(config.host, config.port)
-    if not client.connect(): return [], config.measure_ops // config.connections
+    if not client.connect(): return np.empty(0), config.measure_ops // config.connections, 0
 
-    latencies = []
     errors = 0
+    completed = 0
     ops_per_worker = config.measure_ops // config.connections
+    depth = max(1, config.pipeline)
+    # Record the latency of every `sample_every`-th op only
+    sample_every = sample_interval(config)
+    num_heads = len(heads)
+    latencies = np.empty(ops_per_worker // sample_every + 1 if sample_every else 0, dtype=np.int64) # ns
+    sampled = 0
     
     try:
-        for i in range(ops_per_worker):
-            k = keys[i % len(keys)]
-            v = values[i % len(values)]
+        for start in range(0, ops_per_worker, depth):
+            end = min(start + depth, ops_per_worker)
+            batch = [part for i in range(start, end) for part in (heads[i % num_heads], tail)]
             
-            t0 = time.perf_counter()
-            if config.operation == "SET":
-                ok = client.set(k, v)
-            else:
-                ok = client.get(k)
-            t1 = time.perf_counter()
+            # Each op's latency runs from the batch write to its own reply
+            t0 = time.perf_counter_ns()
+            try:
+                client.send_parts(batch)
+            except:
+                errors += end - start
+                continue
             
-            if ok:
-                latencies.append((t1 - t0) * 1000.0) # ms
-            else:
-                errors += 1
+            for i in range(start, end):
+                try:
+                    reply = client._read_response()
+                    ok = reply == b'+OK' if config.operation == "SET" else True
+                except:
+                    ok = False
+                
+                if ok:
+                    completed += 1
+                    if sample_every and i % sample_every == 0:
+                        latencies[sampled] = time.perf_counter_ns() - t0
+                        sampled += 1
+                else:
+                    errors += 1
     finally:
         client.disconnect()
         
-    return latencies, errors
+    return latencies[:sampled], errors, completed
+
+async def read_response_async(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line: raise Exception("Connection closed")
+    
+    if line.startswith(b'+'): return line.strip()
+    elif line.startswith(b'-'): raise Exception(line.strip().decode())
+    elif line.startswith(b':'): return line.strip()
+    elif line.startswith(b'$'):
+        length = int(line[1:])
+        if length == -1: return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    elif line.startswith(b'*'):
+        count = int(line[1:])
+        return [await read_response_async(reader) for _ in range(count)]
+    return line
+
+async def run_worker_async(config: BenchmarkConfig, heads: List[bytes], tail: bytes) -> Tuple[np.ndarray, int, int]:
+    # asyncio counterpart of run_worker
+    ops_per_worker = config.measure_ops // config.connections
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(config.host, config.port), 5.0)
+    except Exception:
+        return np.empty(0), ops_per_worker, 0
+    writer.get_extra_info('socket').setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    errors = 0
+    completed = 0
+    depth = max(1, config.pipeline)
+    sample_every = sample_interval(config)
+    num_heads = len(heads)
+    latencies = np.empty(ops_per_worker // sample_every + 1 if sample_every else 0, dtype=np.int64) # ns
+    sampled = 0
+    
+    try:
+        for start in range(0, ops_per_worker, depth):
+            end = min(start + depth, ops_per_worker)
+            batch = [part for i in range(start, end) for part in (heads[i % num_heads], tail)]
+            
+            t0 = time.perf_counter_ns()
+            try:
+                writer.writelines(batch)
+                await writer.drain()
+            except:
+                errors += end - start
+                continue
+            
+            for i in range(start, end):
+                try:
+                    reply = await read_response_async(reader)
+                    ok = reply == b'+OK' if config.operation == "SET" else True
+                except:
+                    ok = False
+                
+                if ok:
+                    completed += 1
+                    if sample_every and i % sample_every == 0:
+                        latencies[sampled] = time.perf_counter_ns() - t0
+                        sampled += 1
+                else:
+                    errors += 1
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except:
+            pass
+    
+    return latencies[:sampled], errors, completed
+
+def run_worker_compiled(config: BenchmarkConfig, heads: List[bytes], tail: bytes) -> Tuple[np.ndarray, int, int]:
+    # run_worker on the compiled loop; the socket stays blocking, with send/receive timeouts instead
+    client = RedisProtocolClient(config.host, config.port)
+    ops_per_worker = config.measure_ops // config.connections
+    if not client.connect(): return np.empty(0), ops_per_worker, 0
+    sample_every = sample_interval(config)
+    
+    try:
+        tv = struct.pack('ll', int(client.timeout), 0)
+        client.sock.settimeout(None)
+        client.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, tv)
+        client.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO, tv)
+        out = np.empty(ops_per_worker if sample_every else 0, dtype=np.int64)
+        sampled, errors, completed = run_worker_fast(
+            client.sock.fileno(), heads, tail, config.operation == "SET",
+            ops_per_worker, max(1, config.pipeline), sample_every, out)
+    finally:
+        client.disconnect()
+    
+    return out[:sampled], errors, completed
+
+def run_workers(config: BenchmarkConfig, heads: List[bytes], tail: bytes,
+                executor: ThreadPoolExecutor = None) -> List[Tuple[np.ndarray, int, int]]:
+    # Run config.connections workers concurrently and collect their results.
+    # Thread drivers use `executor` (at least config.connections workers) when given.
+    if config.driver == "asyncio":
+        async def gather():
+            return await asyncio.gather(*[run_worker_async(config, heads, tail) for _ in range(config.connections)])
+        return (uvloop.run if config.uvloop else asyncio.run)(gather())
+    
+    worker = run_worker_compiled if config.driver == "compiled" else run_worker
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=config.connections) as ex:
+            return run_workers(config, heads, tail, ex)
+    futures = [executor.submit(worker, config, heads, tail) for _ in range(config.connections)]
+    return [f.result() for f in as_completed(futures)]
+
+def build_frames(operation: str, keys: List[str], value: bytes) -> Tuple[List[bytes], bytes]:
+    # Pre-encode the requests once per scenario. GET frames are complete; SET
+    # frames are a per-key header plus one shared value tail, so large values
+    # are not copied once per key.
+    if operation == "SET":
+        return [encode_set_header(k, len(value)) for k in keys], value + b'\r\n'
+    return [encode_command("GET", k) for k in keys], b''
+
+def prefill(config: BenchmarkConfig, keys: List[str], value: bytes,
+            executor: ThreadPoolExecutor = None) -> bool:
+    # SET every key to `value`, spreading the keys over several connections
+    # (pre-fill is not measured; large values make it bandwidth-bound).
+    # Runs on `executor` (at least 16 workers, or config.connections) when given.
+    workers = max(1, min(config.connections, 16))
+
+    def fill(part: List[str]) -> bool:
+        c = RedisProtocolClient(config.host, config.port)
+        if not c.connect(): return False
+        try:
+            for k in part: c.set(k, value)
+        finally:
+            c.disconnect()
+        return True
 
-def benchmark(config: BenchmarkConfig) -> BenchmarkResult:
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            return prefill(config, keys, value, ex)
+    return all(executor.map(fill, [keys[i::workers] for i in range(workers)]))
+
+def benchmark(config: BenchmarkConfig, executor: ThreadPoolExecutor = None) -> BenchmarkResult:
     print(f"🚀 Benchmarking {config.name} ({config.host}:{config.port})")
-    print(f"   Op: {config.operation}, Size: {config.data_size}B, Conn: {config.connections}")
+    print(f"   Op: {config.operation}, Size: {config.data_size}B, Conn: {config.connections}, Pipeline: {config.pipeline}, Driver: {config.driver}")
     
     # Prepare data
     keys = [f"key_{i}" for i in range(1000)]
     val = generate_data(config.data_size)
-    values = [val] * 1000 # Reuse same value string to save memory
+    heads, tail = build_frames(config.operation, keys, val)
     
     # Pre-fill for GET
     if config.operation == "GET":
         print("   📝 Pre-filling data...")
-        c = RedisProtocolClient(config.host, config.port)
-        if c.connect():
-            for k in keys: c.set(k, val)
-            c.disconnect()
-        else:
+        if not prefill(config, keys, val, executor):
             print("   ❌ Could not connect for pre-fill")
             return BenchmarkResult(config)
 
     # Warmup
     if config.warmup_ops > 0:
         print(f"   🔥 Warming up ({config.warmup_ops} ops)...")
-        with ThreadPoolExecutor(max_workers=config.connections) as ex:
-            futures = []
-            warmup_per_worker = config.warmup_ops // config.connections
-            for _ in range(config.connections):
-                futures.append(ex.submit(run_worker, 
-                    BenchmarkConfig(config.host, config.port, config.name, 0, config.warmup_ops, config.connections, config.data_size, config.operation),
-                    keys, values))
-            for f in as_completed(futures): f.result()
+        run_workers(replace(config, warmup_ops=0, measure_ops=config.warmup_ops, sample_rate=0.0), heads, tail, executor)
 
     # Measurement
     print(f"   ⏱️  Measuring ({config.measure_ops} ops)...")
     result = BenchmarkResult(config)
     result.start_time = time.perf_counter()
     
-    with ThreadPoolExecutor(max_workers=config.connections) as ex:
-        futures = []
-        for _ in range(config.connections):
-            futures.append(ex.submit(run_worker, config, keys, values))
-            
-        for f in as_completed(futures):
-            lats, errs = f.result()
-            result.latencies.extend(lats)
-            result.errors += errs
+    chunks = []
+    for lats, errs, done in run_workers(config, heads, tail, executor):
+        chunks.append(lats)
+        result.errors += errs
+        result.completed_ops += done
             
     result.end_time = time.perf_counter()
+    # Workers record integer nanoseconds; convert to ms once here
+    result.latencies = np.concatenate(chunks) / 1e6 if chunks else np.empty(0)
+    result.compute_percentiles()
     
-    print(f"   ✅ Done! {result.ops_per_sec:.1f} ops/sec, Avg Lat: {result.avg_latency:.3f}ms")
+    avg_lat = f"{result.avg_latency:.3f}ms" if len(result.latencies) else "not sampled"
+    print(f"   ✅ Done! {result.ops_per_sec:.1f} ops/sec, Avg Lat: {avg_lat}")
     print("-" * 60)
     return result
 
+def load_plotting() -> bool:
+    global plt, sns, pd
+    if plt is None and HAS_PLOTTING:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        import pandas as pd
+        sns.set_theme(style="whitegrid")
+    return plt is not None
+
 def plot_results(results: List[BenchmarkResult], output_dir: str):
-    if not HAS_PLOTTING:
+    if not load_plotting():
         print("⚠️  Skipping plot generation: matplotlib/seaborn/pandas not found.")
         return
 
@@ -229,107 +504,132 @@ def plot_results(results: List[BenchmarkResult], output_dir: str):
         return
     os.makedirs(output_dir, exist_ok=True)
     
-    sns.set_theme(style="whitegrid")
-    
+    # Plot frames are built column-wise from arrays rather than from per-row dicts
+    def scenario(r):
+        return f"{r.config.operation} {r.config.data_size}B"
+
     # 1. Throughput Comparison (Bar Chart)
     plt.figure(figsize=(12, 6))
-    data = []
-    for r in results:
-        data.append({
-            "Server": r.config.name,
-            "Operation": f"{r.config.operation}\n{r.config.data_size}B",
-            "Throughput": r.ops_per_sec
-        })
-    
-    df = pd.DataFrame(data)
+    df = pd.DataFrame({
+        "Server": [r.config.name for r in results],
+        "Operation": [f"{r.config.operation}\n{r.config.data_size}B" for r in results],
+        "Throughput": [r.ops_per_sec for r in results],
+    })
     sns.barplot(data=df, x="Operation", y="Throughput", hue="Server", palette="viridis")
     plt.title("Throughput Comparison (Ops/Sec) - Higher is Better")
     plt.ylabel("Operations / Second")
     plt.savefig(f"{output_dir}/throughput.png")
     plt.close()
 
+    measured = [r for r in results if len(r.latencies)]
+    if not measured:
+        print("⚠️  Skipping latency plots: no latencies were sampled (--sample-rate 0).")
+        return
+
     # 2. Latency Distribution (Box Plot)
     plt.figure(figsize=(12, 6))
-    lat_data = []
-    for r in results:
+    servers, scenarios, lat_arrays = [], [], []
+    for r in measured:
         # Downsample for plotting if too many points
-        lats = r.latencies if len(r.latencies) < 10000 else random.sample(r.latencies, 10000)
-        for l in lats:
-            lat_data.append({
-                "Server": r.config.name,
-                "Scenario": f"{r.config.operation} {r.config.data_size}B",
-                "Latency (ms)": l
-            })
+        lats = r.latencies if len(r.latencies) < 10000 else np.random.choice(r.latencies, 10000, replace=False)
+        servers.append(np.full(len(lats), r.config.name))
+        scenarios.append(np.full(len(lats), scenario(r)))
+        lat_arrays.append(lats)
             
-    lat_df = pd.DataFrame(lat_data)
+    lat_df = pd.DataFrame({
+        "Server": np.concatenate(servers),
+        "Scenario": np.concatenate(scenarios),
+        "Latency (ms)": np.concatenate(lat_arrays),
+    })
     sns.boxplot(data=lat_df, x="Scenario", y="Latency (ms)", hue="Server", palette="viridis", showfliers=False)
     plt.title("Latency Distribution (Lower is Better)")
     plt.savefig(f"{output_dir}/latency_dist.png")
     plt.close()
 
     # 3. Latency Percentiles (Line Plot)
-    plt.figure(figsize=(12, 6))
-    percentiles = [50, 90, 95, 99, 99.9]
-    p_data = []
-    
-    for r in results:
-        if not r.latencies: continue
-        sorted_lats = sorted(r.latencies)
-        n = len(sorted_lats)
-        for p in percentiles:
-            idx = int(n * (p/100.0)) - 1
-            val = sorted_lats[idx]
-            p_data.append({
-                "Server": r.config.name,
-                "Percentile": str(p),
-                "Latency (ms)": val,
-                "Scenario": f"{r.config.operation} {r.config.data_size}B"
-            })
-
-    # Plot separate charts per scenario for clarity
-    scenarios = set(d["Scenario"] for d in p_data)
-    for sc in scenarios:
-        plt.figure(figsize=(10, 5))
-        subset = [d for d in p_data if d["Scenario"] == sc]
-        subset_df = pd.DataFrame(subset)
-        sns.lineplot(data=subset_df, x="Percentile", y="Latency (ms)", hue="Server", marker="o")
-        plt.title(f"Tail Latency - {sc} (Lower is Better)")
-        plt.yscale("log")
-        plt.savefig(f"{output_dir}/tail_latency_{sc.replace(' ', '_')}.png")
-        plt.close()
+    percentiles = list(PERCENTILES)
+    # One row of cached percentiles per result (a single np.percentile pass
+    # each, see compute_percentiles), flattened in the same order as the labels
+    for r in measured:
+        if not r.percentiles: r.compute_percentiles()
+    latency_table = np.array([[r.percentile(p) for p in percentiles] for r in measured])
+    n = len(percentiles)
+    p_df = pd.DataFrame({
+        "Server": np.repeat([r.config.name for r in measured], n),
+        "Percentile": np.tile([str(p) for p in percentiles], len(measured)),
+        "Latency (ms)": latency_table.ravel(),
+        "Scenario": np.repeat([scenario(r) for r in measured], n),
+    })
+
+    # Plot separate charts per scenario for clarity, reusing one figure
+    fig, ax = plt.subplots(figsize=(10, 5))
+    for sc, subset_df in p_df.groupby("Scenario"):
+        ax.clear()
+        sns.lineplot(data=subset_df, x="Percentile", y="Latency (ms)", hue="Server", marker="o", ax=ax)
+        ax.set_title(f"Tail Latency - {sc} (Lower is Better)")
+        ax.set_yscale("log")
+        fig.savefig(f"{output_dir}/tail_latency_{sc.replace(' ', '_')}.png")
+    plt.close(fig)
+
+def dump_record(record: Dict[str, Any]) -> bytes:
+    # One JSON Lines record (orjson when installed)
+    if orjson:
+        return orjson.dumps(record) + b"\n"
+    return json.dumps(record).encode('utf-8') + b"\n"
+
+def load_results(filename: str) -> List[Dict[str, Any]]:
+    # Results are JSON Lines; files written by older versions hold one JSON array
+    with open(filename, 'rb') as f:
+        content = f.read()
+    if content.lstrip().startswith(b'['):
+        return json.loads(content)
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+def migrate_legacy_results(filename: str):
+    # Convert a JSON array results file (this file, or <name>.json next to a
+    # .jsonl target) to JSON Lines so new records can simply be appended
+    legacy = os.path.splitext(filename)[0] + ".json"
+    source = filename if os.path.exists(filename) else legacy
+    if not os.path.exists(source):
+        return
+    try:
+        with open(source, 'rb') as f:
+            if not f.read(64).lstrip().startswith(b'['): return
+        data = load_results(source)
+    except:
+        return
+    with open(filename, 'wb') as f:
+        for item in data:
+            f.write(dump_record(item))
+    print(f"   📦 Converted {source} to JSON Lines ({filename})")
 
 def save_results_json(results: List[BenchmarkResult], filename: str):
-    data = []
-    if os.path.exists(filename):
-        try:
-            with open(filename, 'r') as f:
-                data = json.load(f)
-        except:
-            pass
-            
-    for r in results:
-        data.append({
-            "name": r.config.name,
-            "operation": r.config.operation,
-            "data_size": r.config.data_size,
-            "connections": r.config.connections,
-            "ops_per_sec": r.ops_per_sec,
-            "avg_latency": r.avg_latency,
-            "p50": r.percentile(50),
-            "p99": r.percentile(99)
-        })
-        
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=2)
+    migrate_legacy_results(filename)
+    with open(filename, 'ab') as f:
+        for r in results:
+            # Latency fields are null when none were sampled (--sample-rate 0)
+            sampled = len(r.latencies) > 0
+            f.write(dump_record({
+                "name": r.config.name,
+                "operation": r.config.operation,
+                "data_size": r.config.data_size,
+                "connections": r.config.connections,
+                "ops_per_sec": r.ops_per_sec,
+                "avg_latency": r.avg_latency if sampled else None,
+                "p50": r.percentile(50) if sampled else None,
+                "p99": r.percentile(99) if sampled else None
+            }))
     print(f"   💾 Results saved to {filename}")
 
 def generate_markdown_table(json_file: str):
+    # Until a run migrates it, older results are still in the <name>.json array file
+    if not os.path.exists(json_file):
+        json_file = os.path.splitext(json_file)[0] + ".json"
     if not os.path.exists(json_file):
         print("No results file found.")
         return
 
-    with open(json_file, 'r') as f:
-        data = json.load(f)
+    data = load_results(json_file)
 
     # Group by size and operation
     grouped = {}
@@ -365,14 +665,27 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--out", default="comprehensive_results")
     parser.add_argument("--target", choices=["all", "redis", "ignix"], default="all")
-    parser.add_argument("--json-out", default="benchmark_results.json")
+    parser.add_argument("--json-out", default="benchmark_results.jsonl", help="Results file (JSON Lines, appended to)")
     parser.add_argument("--report-only", action="store_true")
+    parser.add_argument("--pipeline", type=int, default=1, help="Commands per pipelined write (1 = no pipelining)")
+    parser.add_argument("--driver", choices=["asyncio", "threads", "compiled"], default="asyncio",
+                        help="One asyncio task or one thread per connection; "
+                             "compiled runs each thread's loop in C (needs Cython)")
+    parser.add_argument("--uvloop", action="store_true", help="Run the asyncio driver on uvloop")
+    parser.add_argument("--sample-rate", type=float, default=1.0, help="Fraction of ops whose latency is recorded, 0 for none (throughput always counts every op)")
     args = parser.parse_args()
     
     if args.report_only:
         generate_markdown_table(args.json_out)
         return
     
+    if args.driver == "compiled" and not load_run_worker_fast():
+        print("⚠️  Compiled driver unavailable (pip install cython); using threads.")
+        args.driver = "threads"
+    if args.uvloop and uvloop is None:
+        print("⚠️  uvloop not installed (pip install uvloop), using the default event loop")
+        args.uvloop = False
+    
     configs = []
     
     # Define targets
@@ -387,28 +700,39 @@ def main():
         # Small sizes: High ops count
         for size in [64, 1024]:
             for op in ["SET", "GET"]:
-                configs.append(BenchmarkConfig(host, port, name, 1000, 10000, 50, size, op))
+                configs.append(BenchmarkConfig(host, port, name, 1000, 10000, 50, size, op, args.pipeline, args.sample_rate, args.driver, args.uvloop))
 
         # Medium sizes: Moderate ops count
         for size in [32 * 1024, 256 * 1024]: # 32KB, 256KB
             for op in ["SET", "GET"]:
-                configs.append(BenchmarkConfig(host, port, name, 500, 5000, 20, size, op))
+                configs.append(BenchmarkConfig(host, port, name, 500, 5000, 20, size, op, args.pipeline, args.sample_rate, args.driver, args.uvloop))
 
         # Large sizes: Low ops count
         for size in [2 * 1024 * 1024]: # 2MB
             for op in ["SET", "GET"]:
-                configs.append(BenchmarkConfig(host, port, name, 100, 1000, 10, size, op))
+                configs.append(BenchmarkConfig(host, port, name, 100, 1000, 10, size, op, args.pipeline, args.sample_rate, args.driver, args.uvloop))
 
-    results = []
-    for conf in configs:
-        try:
-            res = benchmark(conf)
-            results.append(res)
-        except Exception as e:
-            print(f"❌ Failed: {e}")
+    # One pool is shared across scenarios: every driver pre-fills on it, and the
+    # thread drivers also run warmup and measurement there
+    executor = None
+    if configs:
+        executor = ThreadPoolExecutor(max_workers=max(c.connections for c in configs))
 
-    if args.json_out:
-        save_results_json(results, args.json_out)
+    results = []
+    try:
+        for conf in configs:
+            try:
+                res = benchmark(conf, executor)
+                results.append(res)
+            except Exception as e:
+                print(f"❌ Failed: {e}")
+                continue
+            # Saved as each scenario finishes so an aborted run keeps earlier results
+            if args.json_out:
+                save_results_json([res], args.json_out)
+    finally:
+        if executor:
+            executor.shutdown()
 
     plot_results(results, args.out)
     print(f"\n✨ Comprehensive benchmark complete. Charts saved to {args.out}/")
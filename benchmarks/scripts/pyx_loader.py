@@ -0,0 +1,20 @@
+"""Lazy builds of the optional Cython modules used by the benchmark scripts
+
+pyximport.install() takes about half a second, so the scripts never import
+their .pyx modules at the top. Each one calls load_pyx_attr() once a run
+actually needs the compiled code and keeps the pure-Python path when it
+returns None.
+"""
+
+import importlib
+from typing import Any, Optional
+
+
+def load_pyx_attr(module: str, name: str) -> Optional[Any]:
+    """Build (on first use) and import `module`.pyx and return its `name`; None without Cython"""
+    try:
+        import pyximport
+        pyximport.install(language_level=3)
+        return getattr(importlib.import_module(module), name)
+    except Exception:
+        return None
@@ -0,0 +1,111 @@
+# Raw socket I/O shared by the compiled benchmark loops (quick_batch.pyx and
+# run_worker_fast.pyx): a private read buffer over a blocking fd, and a
+# writev() loop that resumes after partial writes. Pulled in with `include`;
+# each loop keeps its own read_reply, since they count replies differently.
+
+from libc.errno cimport errno, EINTR
+from libc.string cimport memchr, memmove
+from posix.time cimport clock_gettime, timespec, CLOCK_MONOTONIC
+from posix.unistd cimport read
+
+
+cdef extern from "sys/uio.h" nogil:
+    struct iovec:
+        void* iov_base
+        size_t iov_len
+    ssize_t writev(int fd, const iovec* iov, int iovcnt)
+
+
+cdef enum:
+    BUF_SIZE = 65536
+    MAX_IOV = 512  # Well below IOV_MAX (1024 on Linux)
+
+
+cdef struct Reader:
+    int fd
+    char* buf
+    Py_ssize_t start
+    Py_ssize_t end
+
+
+cdef inline long long now_ns() nogil:
+    cdef timespec ts
+    clock_gettime(CLOCK_MONOTONIC, &ts)
+    return ts.tv_sec * 1000000000LL + ts.tv_nsec
+
+
+cdef int fill(Reader* r) nogil:
+    """Compact the buffer and read more bytes; 0 on EOF, error or overflow"""
+    cdef ssize_t got
+    if r.start > 0:
+        memmove(r.buf, r.buf + r.start, r.end - r.start)
+        r.end -= r.start
+        r.start = 0
+    if r.end == BUF_SIZE:
+        return 0
+    while True:
+        got = read(r.fd, r.buf + r.end, BUF_SIZE - r.end)
+        if got < 0 and errno == EINTR:
+            continue
+        if got <= 0:
+            return 0
+        r.end += got
+        return 1
+
+
+cdef Py_ssize_t read_line(Reader* r) nogil:
+    """Length of the next line including \\r\\n (it starts at r.start); -1 on failure"""
+    cdef char* nl
+    while True:
+        nl = <char*>memchr(r.buf + r.start, 10, r.end - r.start)
+        if nl != NULL:
+            return nl - (r.buf + r.start) + 1
+        if not fill(r):
+            return -1
+
+
+cdef int skip(Reader* r, Py_ssize_t n) nogil:
+    """Discard `n` bytes of the stream; 0 on failure"""
+    cdef Py_ssize_t avail
+    while n > 0:
+        if r.start == r.end:
+            r.start = r.end = 0
+            if not fill(r):
+                return 0
+        avail = r.end - r.start
+        if avail > n:
+            avail = n
+        r.start += avail
+        n -= avail
+    return 1
+
+
+cdef long parse_int(const char* s, Py_ssize_t n) nogil:
+    cdef long value = 0
+    cdef Py_ssize_t i = 0
+    cdef bint negative = n > 0 and s[0] == b'-'
+    if negative:
+        i = 1
+    while i < n:
+        value = value * 10 + (s[i] - 48)
+        i += 1
+    return -value if negative else value
+
+
+cdef int send_all(int fd, iovec* iov, int count) nogil:
+    """writev() every buffer in `iov`, resuming after partial writes; 0 on failure"""
+    cdef ssize_t sent
+    cdef int first = 0
+    while first < count:
+        sent = writev(fd, iov + first, count - first if count - first < MAX_IOV else MAX_IOV)
+        if sent < 0:
+            if errno == EINTR:
+                continue
+            return 0
+        while first < count and sent >= <ssize_t>iov[first].iov_len:
+            sent -= iov[first].iov_len
+            first += 1
+        if sent > 0:
+            iov[first].iov_base = <char*>iov[first].iov_base + sent
+            iov[first].iov_len -= sent
+    return 1
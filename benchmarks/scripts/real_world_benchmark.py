@@ -1,30 +1,54 @@
 #!/usr/bin/env python3
 
+import asyncio
 import socket
 import time
 import threading
-import statistics
 import json
 import os
 import sys
 import random
-import string
-import math
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import multiprocessing
+from multiprocessing import shared_memory
+from queue import Empty
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Tuple
 import argparse
 
+import numpy as np
+
+from pyx_loader import load_pyx_attr
+
 try:
     import matplotlib.pyplot as plt
     import seaborn as sns
-    import numpy as np
     import pandas as pd
-    HAS_DEPS = True
+    HAS_PLOTTING = True
+except ImportError:
+    HAS_PLOTTING = False
+    print("⚠️  pandas, matplotlib, or seaborn not found.")
+    print("   Installation: pip install pandas matplotlib seaborn")
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+try:
+    import orjson
 except ImportError:
-    HAS_DEPS = False
-    print("⚠️  numpy, pandas, matplotlib, or seaborn not found.")
-    print("   Installation: pip install numpy pandas matplotlib seaborn")
+    orjson = None
+
+# Optional C reply parser
+try:
+    import hiredis
+except ImportError:
+    hiredis = None
+
+# Optional compiled RESP encoder (resp_encoder.pyx), loaded by load_resp_encoder
+build_resp = None
 
 @dataclass
 class WorkloadConfig:
@@ -38,12 +62,16 @@ class WorkloadConfig:
     zipf_param: float # s parameter for Zipfian distribution (s > 1)
     value_size_min: int
     value_size_max: int
+    pipeline_depth: int = 1 # commands sent per write (1 = no pipelining)
+    driver: str = "asyncio" # "asyncio": one event loop running every connection, "threads": one thread each
+    client_procs: int = 1 # processes the connections are spread over, each pinned to one core
+    uvloop: bool = False # asyncio driver only: run the event loop on uvloop
 
 @dataclass
 class BenchmarkResult:
     config: WorkloadConfig
-    latencies_get: List[float] = field(default_factory=list)
-    latencies_set: List[float] = field(default_factory=list)
+    latencies_get: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float32)) # ms
+    latencies_set: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float32)) # ms
     start_time: float = 0.0
     end_time: float = 0.0
     errors: int = 0
@@ -60,24 +88,144 @@ class BenchmarkResult:
     def throughput(self):
         return self.total_ops / self.duration if self.duration > 0 else 0
 
+def mean_latency(lats: np.ndarray) -> float:
+    return float(lats.mean()) if len(lats) else 0
+
+def p99_latency(lats: np.ndarray) -> float:
+    return float(np.percentile(lats, 99)) if len(lats) >= 100 else 0
+
+SET = b"SET"
+GET = b"GET"
+OK = b"OK" # SET's simple-string reply, as every parser here returns it
+BULK = ord('$')
+ERROR = ord('-')
+SIMPLE = ord('+')
+MSET = b"MSET"
+MSET_BATCH = 200 # keys per MSET during pre-fill
+SOCKET_BUFFER_SIZE = 1 << 20
+
+class RespReplyParser:
+    """Parses replies straight out of one receive buffer filled by recv_into.
+
+    Pipelined replies that arrive together are parsed without further reads,
+    and payloads are returned as memoryviews into the buffer, valid only
+    until the next call.
+    """
+    def __init__(self, sock: socket.socket, size: int = 1 << 20):
+        self.sock = sock
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+        self.rpos = 0 # first unparsed byte
+        self.wpos = 0 # end of the received bytes
+
+    def feed(self):
+        """Receive more bytes, first making room at the end of the buffer."""
+        if self.rpos == self.wpos:
+            self.rpos = self.wpos = 0
+        elif self.wpos == len(self.buf):
+            n = self.wpos - self.rpos
+            if self.rpos == 0:
+                # A single reply larger than the buffer: grow it
+                self.view.release()
+                self.buf = self.buf + bytes(len(self.buf))
+                self.view = memoryview(self.buf)
+            else:
+                self.buf[:n] = self.buf[self.rpos:self.wpos]
+                self.rpos, self.wpos = 0, n
+        n = self.sock.recv_into(self.view[self.wpos:])
+        if not n: raise ConnectionError("Connection closed")
+        self.wpos += n
+
+    def next_reply(self) -> Tuple[int, Any]:
+        """Return (type byte, payload) for the next reply; payload is None for nil."""
+        end = self.buf.find(b'\r\n', self.rpos, self.wpos)
+        while end == -1:
+            self.feed()
+            end = self.buf.find(b'\r\n', self.rpos, self.wpos)
+        kind = self.buf[self.rpos]
+        if kind != BULK:
+            payload = self.view[self.rpos + 1:end]
+            self.rpos = end + 2
+            return kind, payload
+
+        length = int(self.buf[self.rpos + 1:end])
+        if length < 0:
+            self.rpos = end + 2
+            return kind, None
+        # Offsets relative to rpos, which feed() may move
+        header = end + 2 - self.rpos
+        while self.wpos - self.rpos < header + length + 2:
+            self.feed()
+        start = self.rpos + header
+        self.rpos = start + length + 2
+        return kind, self.view[start:start + length]
+
+    _scratch = memoryview(bytearray(65536)) # sink for skipped payload bytes
+
+    def skip_reply(self) -> int:
+        """Consume the next reply without keeping its payload; return its type byte.
+
+        A bulk payload that has not fully arrived is read into a scratch
+        buffer and dropped, instead of being accumulated in `buf`.
+        """
+        end = self.buf.find(b'\r\n', self.rpos, self.wpos)
+        while end == -1:
+            self.feed()
+            end = self.buf.find(b'\r\n', self.rpos, self.wpos)
+        kind = self.buf[self.rpos]
+        if kind != BULK:
+            self.rpos = end + 2
+            return kind
+        
+        length = int(self.buf[self.rpos + 1:end])
+        self.rpos = end + 2
+        if length < 0: return kind
+        remaining = length + 2
+        buffered = min(remaining, self.wpos - self.rpos)
+        self.rpos += buffered
+        remaining -= buffered
+        while remaining:
+            # Never read past the payload: what follows is the next reply
+            n = self.sock.recv_into(self._scratch[:min(remaining, len(self._scratch))])
+            if not n: raise ConnectionError("Connection closed")
+            remaining -= n
+        return kind
+
 class RedisProtocolClient:
     def __init__(self, host: str, port: int, timeout: float = 5.0):
         self.host = host
         self.port = port
         self.timeout = timeout
         self.sock = None
+        self.replies = None
+        self.parser = None
 
     def connect(self) -> bool:
         try:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # Room for a whole pipelined batch of 1-2 KB values per syscall;
+            # set before connect() so the receive window is scaled to match
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
             self.sock.settimeout(self.timeout)
             self.sock.connect((self.host, self.port))
+            if hasattr(socket, "TCP_QUICKACK"): # Linux only
+                self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+            if hiredis is not None:
+                self.parser = hiredis.Reader()
+                self._recv_buf = bytearray(65536)
+            else:
+                # One receive buffer for the connection's lifetime: bytes read
+                # ahead belong to the next reply and must not be thrown away
+                self.replies = RespReplyParser(self.sock)
             return True
         except Exception as e:
             return False
 
     def disconnect(self):
+        self.replies = None
+        self.parser = None
         if self.sock:
             try:
                 self.sock.close()
@@ -85,172 +233,445 @@ class RedisProtocolClient:
                 pass
             self.sock = None
 
+    @staticmethod
+    def _encode(*args: bytes) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            parts.extend((b"$%d\r\n" % len(arg), arg, b"\r\n"))
+        return b"".join(parts)
+
     def _send_command(self, *args) -> bytes:
         if not self.sock: raise Exception("No connection")
         
-        resp = f"*{len(args)}\r\n"
-        for arg in args:
-            s = str(arg).encode('utf-8')
-            resp += f"${len(s)}\r\n"
-            resp += s.decode('utf-8') + "\r\n"
-        
-        self.sock.sendall(resp.encode('utf-8'))
+        self.sock.sendall(self._encode(*args))
         return self._read_response()
 
+    def send_frames(self, frames: List[bytes]):
+        """Send already encoded commands (or pieces of them) in one write."""
+        if not self.sock: raise Exception("No connection")
+        self.sock.sendall(b"".join(frames))
+
+    def pipeline(self, commands: List[Tuple]):
+        """Send all commands in one write, then yield each reply as it arrives.
+
+        Error replies are yielded as Exception instances so one failed command
+        does not hide the replies queued behind it.
+        """
+        self.send_frames([self._encode(*c) for c in commands])
+        for _ in commands:
+            try:
+                yield self._read_response()
+            except OSError:
+                raise
+            except Exception as e:
+                yield e
+
     def _read_response(self) -> bytes:
-        f = self.sock.makefile('rb')
-        line = f.readline()
-        if not line: raise Exception("Connection closed")
+        if self.parser is not None:
+            reply = self.parser.gets()
+            while reply is False:
+                n = self.sock.recv_into(self._recv_buf)
+                if not n: raise ConnectionError("Connection closed")
+                self.parser.feed(self._recv_buf, 0, n)
+                reply = self.parser.gets()
+            if isinstance(reply, hiredis.ReplyError): raise reply
+            return reply
         
-        if line.startswith(b'+'): return line.strip()
-        elif line.startswith(b'-'): raise Exception(line.strip().decode())
-        elif line.startswith(b':'): return line.strip()
-        elif line.startswith(b'$'):
-            length = int(line[1:])
-            if length == -1: return None
-            data = f.read(length)
-            f.read(2) # CRLF
-            return data
-        return line
-
-    def set(self, key: str, value: str) -> bool:
+        # Without hiredis replies stay views into the receive buffer
+        kind, payload = self.replies.next_reply()
+        if kind == ERROR: raise Exception(bytes(payload).decode())
+        return payload
+
+    def _read_response_discard(self) -> int:
+        """Read one reply when only its outcome matters; return its type byte.
+
+        SET can only answer +OK or an error and GET's value is never looked
+        at, so the type byte is all the benchmark needs.
+        """
+        if self.parser is None:
+            return self.replies.skip_reply()
+        try:
+            reply = self._read_response()
+        except OSError:
+            raise
+        except Exception:
+            return ERROR
+        return SIMPLE if reply == OK else BULK
+
+    def set(self, key: bytes, value: bytes) -> bool:
         try:
-            return self._send_command("SET", key, value) == b'+OK'
+            return self._send_command(SET, key, value) == OK
         except:
             return False
 
-    def get(self, key: str) -> bool:
+    def get(self, key: bytes) -> bool:
         try:
-            self._send_command("GET", key)
-            return True
+            self.sock.sendall(self._encode(GET, key))
+            return self._read_response_discard() != ERROR
         except:
             return False
 
-def generate_zipfian_indices(n: int, s: float, num_samples: int) -> List[int]:
-    """Generate indices based on Zipfian distribution."""
-    if HAS_DEPS:
-        # Use numpy for efficiency
-        # Zipf distribution in numpy is 1-based, so we subtract 1
-        return (np.random.zipf(s, num_samples) - 1) % n
-    else:
-        # Fallback (slower)
-        print("⚠️  Using slow fallback for Zipfian generation...")
-        weights = [1.0 / math.pow(i + 1, s) for i in range(n)]
-        total = sum(weights)
-        probs = [w / total for w in weights]
-        return random.choices(range(n), weights=probs, k=num_samples)
-
-def generate_json_value(size: int) -> str:
-    """Generate a pseudo-JSON string of approx size."""
-    # Simple padding to reach size
-    padding = ''.join(random.choices(string.ascii_letters, k=size - 20))
-    return json.dumps({"data": padding})
-
-def run_worker(config: WorkloadConfig, keys: List[str], key_indices: List[int]) -> Tuple[List[float], List[float], int]:
+def load_resp_encoder() -> bool:
+    """Load build_resp from resp_encoder.pyx on first use; False without Cython
+
+    It then replaces RedisProtocolClient._encode.
+    """
+    global build_resp
+    if build_resp is None:
+        build_resp = load_pyx_attr("resp_encoder", "build_resp")
+        if build_resp is not None:
+            RedisProtocolClient._encode = staticmethod(build_resp)
+    return build_resp is not None
+
+def generate_zipfian_indices(n: int, s: float, num_samples: int) -> np.ndarray:
+    """Generate indices in [0, n) based on a Zipfian distribution."""
+    # Invert the CDF of the bounded distribution: one vectorised pass,
+    # no rejection sampling and no wrap-around of the unbounded tail
+    cdf = np.cumsum(1.0 / np.power(np.arange(1, n + 1, dtype=np.float64), s))
+    cdf /= cdf[-1]
+    rng = np.random.default_rng()
+    return np.minimum(np.searchsorted(cdf, rng.random(num_samples)), n - 1).astype(np.int32)
+
+VALUE_BLOB_SIZE = 4 * 1024 * 1024
+_value_blob = None
+
+def generate_json_value(size: int) -> bytes:
+    """Generate a pseudo-JSON value of `size` bytes, encoded for the wire."""
+    global _value_blob
+    if _value_blob is None:
+        # Letters drawn once; every value is a slice of them
+        rng = np.random.default_rng()
+        _value_blob = rng.integers(ord('a'), ord('z') + 1, VALUE_BLOB_SIZE, dtype=np.uint8).tobytes()
+    n = max(0, size - 12)
+    off = random.randrange(VALUE_BLOB_SIZE - n + 1)
+    return b'{"data": "' + _value_blob[off:off + n] + b'"}'
+
+def fill_batch(task: Tuple[str, int, List[bytes], int]) -> bool:
+    """Pre-fill `keys` with MSET_BATCH keys per round trip (pool worker)."""
+    host, port, keys, value_size = task
+    client = RedisProtocolClient(host, port)
+    if not client.connect(): return False
+    try:
+        for i in range(0, len(keys), MSET_BATCH):
+            # One generated value shared by each MSET
+            value = generate_json_value(value_size)
+            args = [MSET]
+            for k in keys[i:i + MSET_BATCH]:
+                args += (k, value)
+            client._send_command(*args)
+    finally:
+        client.disconnect()
+    return True
+
+def build_key_frames(keys: List[bytes]) -> Tuple[List[bytes], List[bytes]]:
+    """Encode, once per key, the whole GET command and the SET command up to its value."""
+    get_frames = [RedisProtocolClient._encode(GET, k) for k in keys]
+    set_prefixes = [b"*3\r\n$3\r\nSET\r\n$%d\r\n%s\r\n" % (len(k), k) for k in keys]
+    return get_frames, set_prefixes
+
+def encode_value(value: bytes) -> bytes:
+    """The bulk-string tail that completes a set_prefixes entry."""
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+def plan_ops(config: WorkloadConfig, key_indices: np.ndarray) -> Tuple[List[int], List[bool], List[int], List[bytes]]:
+    """Draw everything a worker's ops need before the timed loop starts."""
+    # Pre-generate values to avoid overhead during measurement
+    # We use a small pool of values, already encoded as SET tails
+    value_tails = [encode_value(generate_json_value(random.randint(config.value_size_min, config.value_size_max)))
+                   for _ in range(100)]
+    # Likewise draw the read/write mix and value choices for every op up front
+    rng = np.random.default_rng()
+    is_reads = (rng.random(len(key_indices)) < config.read_ratio).tolist()
+    value_idx = rng.integers(0, len(value_tails), len(key_indices)).tolist()
+    return key_indices.tolist(), is_reads, value_idx, value_tails
+
+def run_worker(config: WorkloadConfig, frames: Tuple[List[bytes], List[bytes]], key_indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
     client = RedisProtocolClient(config.host, config.port)
-    if not client.connect(): return [], [], 0
+    if not client.connect(): return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32), 0
 
-    lats_get = []
-    lats_set = []
+    # Pre-sized per worker (ms); filled up to n_get/n_set and trimmed on return
+    lats_get = np.empty(len(key_indices), dtype=np.float32)
+    lats_set = np.empty(len(key_indices), dtype=np.float32)
+    n_get = n_set = 0
     errors = 0
+    depth = max(1, config.pipeline_depth)
+    get_frames, set_prefixes = frames
     
-    # Pre-generate values to avoid overhead during measurement
-    # We use a small pool of values
-    values_pool = [generate_json_value(random.randint(config.value_size_min, config.value_size_max)) for _ in range(100)]
+    key_indices, is_reads, value_idx, value_tails = plan_ops(config, key_indices)
     
+    pending = deque() # is_read per command of the batch in flight, in reply order
+    done = 0 # ops whose reply has been handled
     try:
-        for idx in key_indices:
-            key = keys[idx]
-            is_read = random.random() < config.read_ratio
+        for start in range(0, len(key_indices), depth):
+            end = start + depth
+            batch = []
+            for idx, is_read, v in zip(key_indices[start:end], is_reads[start:end], value_idx[start:end]):
+                if is_read:
+                    batch.append(get_frames[idx])
+                else:
+                    batch += (set_prefixes[idx], value_tails[v])
+                pending.append(is_read)
             
+            # Each op's latency runs from the batch write to its own reply
             t0 = time.perf_counter()
-            if is_read:
-                ok = client.get(key)
-                t1 = time.perf_counter()
-                if ok: lats_get.append((t1 - t0) * 1000.0)
-                else: errors += 1
-            else:
-                val = random.choice(values_pool)
-                ok = client.set(key, val)
+            client.send_frames(batch)
+            while pending:
+                kind = client._read_response_discard()
                 t1 = time.perf_counter()
-                if ok: lats_set.append((t1 - t0) * 1000.0)
-                else: errors += 1
+                is_read = pending.popleft()
+                done += 1
+                if kind == ERROR or (not is_read and kind != SIMPLE):
+                    errors += 1
+                elif is_read:
+                    lats_get[n_get] = (t1 - t0) * 1000.0
+                    n_get += 1
+                else:
+                    lats_set[n_set] = (t1 - t0) * 1000.0
+                    n_set += 1
+    except Exception:
+        # Connection lost: the rest of this worker's ops cannot succeed
+        errors += len(key_indices) - done
     finally:
         client.disconnect()
         
-    return lats_get, lats_set, errors
+    return lats_get[:n_get], lats_set[:n_set], errors
 
-def benchmark(config: WorkloadConfig) -> BenchmarkResult:
+async def read_response_async(reader: asyncio.StreamReader) -> bytes:
+    line = await reader.readline()
+    if not line: raise ConnectionError("Connection closed")
+    
+    if line.startswith(b'+'): return line[1:-2]
+    elif line.startswith(b'-'): raise Exception(line.strip().decode())
+    elif line.startswith(b':'): return line[1:-2]
+    elif line.startswith(b'$'):
+        length = int(line[1:])
+        if length == -1: return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    return line
+
+async def run_worker_async(config: WorkloadConfig, frames: Tuple[List[bytes], List[bytes]], key_indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+    # asyncio counterpart of run_worker: a producer keeps up to pipeline_depth
+    # commands in flight and a consumer matches replies to them in order
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(config.host, config.port), 5.0)
+    except Exception:
+        return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32), 0
+    writer.get_extra_info('socket').setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    lats_get = np.empty(len(key_indices), dtype=np.float32)
+    lats_set = np.empty(len(key_indices), dtype=np.float32)
+    n_get = n_set = 0
+    errors = 0
+    get_frames, set_prefixes = frames
+    key_indices, is_reads, value_idx, value_tails = plan_ops(config, key_indices)
+    n = len(key_indices)
+    pending = deque() # (is_read, t0) per command written but not yet answered
+    window = asyncio.Semaphore(max(1, config.pipeline_depth))
+    
+    async def produce():
+        i = 0
+        while i < n:
+            await window.acquire()
+            # Fill every free slot of the window with one write
+            batch = []
+            t0 = time.perf_counter()
+            while True:
+                idx = key_indices[i]
+                if is_reads[i]:
+                    batch.append(get_frames[idx])
+                else:
+                    batch += (set_prefixes[idx], value_tails[value_idx[i]])
+                pending.append((is_reads[i], t0))
+                i += 1
+                if i == n or window.locked(): break
+                await window.acquire()
+            writer.writelines(batch)
+            await writer.drain()
+    
+    producer = asyncio.ensure_future(produce())
+    done = 0
+    try:
+        while done < n:
+            try:
+                reply = await read_response_async(reader)
+            except (OSError, EOFError):
+                raise
+            except Exception as e:
+                reply = e
+            t1 = time.perf_counter()
+            is_read, t0 = pending.popleft()
+            window.release()
+            done += 1
+            if isinstance(reply, Exception) or (not is_read and reply != OK):
+                errors += 1
+            elif is_read:
+                lats_get[n_get] = (t1 - t0) * 1000.0
+                n_get += 1
+            else:
+                lats_set[n_set] = (t1 - t0) * 1000.0
+                n_set += 1
+    except Exception:
+        # Connection lost: the rest of this worker's ops cannot succeed
+        errors += n - done
+    finally:
+        producer.cancel()
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except:
+            pass
+    
+    return lats_get[:n_get], lats_set[:n_set], errors
+
+def run_workers(config: WorkloadConfig, frames: Tuple[List[bytes], List[bytes]],
+                slices: List[np.ndarray], executor: ThreadPoolExecutor = None) -> List[Tuple[np.ndarray, np.ndarray, int]]:
+    # Run one worker per slice of key indices concurrently.
+    # The threads driver uses `executor` (at least len(slices) workers) when given.
+    if config.driver == "asyncio":
+        async def gather():
+            return await asyncio.gather(*[run_worker_async(config, frames, s) for s in slices])
+        return (uvloop.run if config.uvloop else asyncio.run)(gather())
+    
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=len(slices)) as ex:
+            return run_workers(config, frames, slices, ex)
+    futures = [executor.submit(run_worker, config, frames, s) for s in slices]
+    wait(futures)
+    return [f.result() for f in futures]
+
+def run_client_proc(cpu: int, config: WorkloadConfig, frames: Tuple[List[bytes], List[bytes]],
+                    shm_name: str, num_indices: int, workers: List[int], ops_per_worker: int,
+                    queue: multiprocessing.Queue):
+    # One of --client-procs processes: pinned to `cpu`, runs connections `workers`.
+    # Their key indices are views of the parent's array in shared memory `shm_name`.
+    if hasattr(os, "sched_setaffinity"): # Linux only
+        os.sched_setaffinity(0, {cpu})
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        indices = np.ndarray(num_indices, dtype=np.int32, buffer=shm.buf)
+        slices = [indices[i * ops_per_worker:(i + 1) * ops_per_worker] for i in workers]
+        start = time.perf_counter()
+        results = run_workers(config, frames, slices)
+        end = time.perf_counter()
+        del indices, slices # views must be gone before the block is closed
+    finally:
+        shm.close()
+    queue.put((start, end,
+               np.concatenate([r[0] for r in results]),
+               np.concatenate([r[1] for r in results]),
+               sum(r[2] for r in results)))
+
+def run_client_procs(config: WorkloadConfig, frames: Tuple[List[bytes], List[bytes]],
+                     indices: np.ndarray, ops_per_worker: int) -> Tuple[float, float, List[Tuple[np.ndarray, np.ndarray, int]]]:
+    # Spread the connections over config.client_procs processes, one core each,
+    # so the client is not limited to what one interpreter can drive.
+    # Returns (first start, last end, per-process results).
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    nprocs = min(config.client_procs, config.connections)
+    # All processes read their slices from one shared copy of the indices
+    shm = shared_memory.SharedMemory(create=True, size=max(1, indices.nbytes))
+    try:
+        np.ndarray(len(indices), dtype=np.int32, buffer=shm.buf)[:] = indices
+        queue = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=run_client_proc,
+                                         args=(cpus[p % len(cpus)], config, frames, shm.name, len(indices),
+                                               list(range(p, config.connections, nprocs)), ops_per_worker, queue))
+                 for p in range(nprocs)]
+        for proc in procs: proc.start()
+        # Drain the queue before joining: a child blocks on exit until its result is read.
+        # A child that dies never sends one, so keep checking for exit codes while waiting
+        parts = []
+        try:
+            while len(parts) < len(procs):
+                try:
+                    parts.append(queue.get(timeout=1))
+                except Empty:
+                    failed = [proc.exitcode for proc in procs if proc.exitcode]
+                    if failed:
+                        raise RuntimeError(f"client process exited with code {failed[0]}")
+            for proc in procs: proc.join()
+        finally:
+            for proc in procs:
+                if proc.is_alive():
+                    proc.terminate()
+    finally:
+        shm.close()
+        shm.unlink()
+    
+    # perf_counter is system-wide monotonic, so child timestamps are comparable
+    start = min(p[0] for p in parts)
+    end = max(p[1] for p in parts)
+    return start, end, [p[2:] for p in parts]
+
+def benchmark(config: WorkloadConfig, executor: ThreadPoolExecutor = None) -> BenchmarkResult:
     print(f"🌍 Running Real-World Scenario: {config.name}")
     print(f"   Keys: {config.num_keys}, Ops: {config.num_ops}, Conn: {config.connections}")
     print(f"   Mix: {int(config.read_ratio*100)}% Read / {int((1-config.read_ratio)*100)}% Write")
-    print(f"   Dist: Zipfian (s={config.zipf_param})")
+    print(f"   Dist: Zipfian (s={config.zipf_param}), Driver: {config.driver}")
+    if config.pipeline_depth > 1:
+        print(f"   Pipeline depth: {config.pipeline_depth}")
+    if config.client_procs > 1:
+        print(f"   Client processes: {config.client_procs}")
     
     # 1. Prepare Keys
     print("   🔑 Generating keys...")
-    keys = [f"user:{i}" for i in range(config.num_keys)]
+    # Encoded once here so workers never re-encode them
+    keys = [f"user:{i}".encode('utf-8') for i in range(config.num_keys)]
     
     # 2. Pre-fill Data
     print("   📝 Pre-filling database...")
-    c = RedisProtocolClient(config.host, config.port)
-    if c.connect():
-        # Fill a subset to save time, or all?
-        # Let's fill all keys with initial data
-        # Use pipeline-like batching if we had it, but here serial is fine for 10k keys
-        # For 100k keys this might be slow. Let's use threads.
-        def fill_batch(batch_keys):
-            cl = RedisProtocolClient(config.host, config.port)
-            if cl.connect():
-                for k in batch_keys:
-                    cl.set(k, generate_json_value(config.value_size_min))
-                cl.disconnect()
-        
-        chunk_size = len(keys) // 10
-        with ThreadPoolExecutor(max_workers=10) as ex:
-            futures = []
-            for i in range(0, len(keys), chunk_size):
-                chunk = keys[i:i+chunk_size]
-                futures.append(ex.submit(fill_batch, chunk))
-            for f in as_completed(futures): f.result()
-        c.disconnect()
-    else:
+    # One process per core so building the MSET frames is not serialized on
+    # the GIL; each process fills its share of the keys over one connection
+    nproc = os.cpu_count() or 1
+    chunk_size = max(1, len(keys) // nproc)
+    tasks = [(config.host, config.port, keys[i:i + chunk_size], config.value_size_min)
+             for i in range(0, len(keys), chunk_size)]
+    with multiprocessing.Pool(processes=min(nproc, len(tasks))) as pool:
+        filled = pool.map(fill_batch, tasks)
+    if not all(filled):
         print("   ❌ Could not connect for pre-fill")
         return BenchmarkResult(config)
 
     # 3. Generate Workload Indices
     print("   🎲 Generating workload distribution...")
-    # Each worker gets a slice of operations
+    # Drawn once up front, outside the timed section; each worker gets a slice
     ops_per_worker = config.num_ops // config.connections
+    indices = generate_zipfian_indices(config.num_keys, config.zipf_param, ops_per_worker * config.connections)
+    
+    # Every op's command is then a lookup (GET) or a lookup plus a value tail (SET)
+    frames = build_key_frames(keys)
     
     # 4. Run Benchmark
     print(f"   🚀 Starting simulation...")
     result = BenchmarkResult(config)
-    result.start_time = time.perf_counter()
+    gets, sets = [], []
+    if config.client_procs > 1:
+        result.start_time, result.end_time, worker_results = run_client_procs(config, frames, indices, ops_per_worker)
+    else:
+        # Workers read views of the one index array, no copies
+        slices = [indices[i * ops_per_worker:(i + 1) * ops_per_worker] for i in range(config.connections)]
+        result.start_time = time.perf_counter()
+        worker_results = run_workers(config, frames, slices, executor)
+        result.end_time = time.perf_counter()
     
-    with ThreadPoolExecutor(max_workers=config.connections) as ex:
-        futures = []
-        for _ in range(config.connections):
-            # Generate indices for this worker
-            indices = generate_zipfian_indices(config.num_keys, config.zipf_param, ops_per_worker)
-            futures.append(ex.submit(run_worker, config, keys, indices))
-            
-        for f in as_completed(futures):
-            lg, ls, err = f.result()
-            result.latencies_get.extend(lg)
-            result.latencies_set.extend(ls)
-            result.errors += err
-            
-    result.end_time = time.perf_counter()
+    for lg, ls, err in worker_results:
+        gets.append(lg)
+        sets.append(ls)
+        result.errors += err
+
+    result.latencies_get = np.concatenate(gets)
+    result.latencies_set = np.concatenate(sets)
     
     print(f"   ✅ Done! Throughput: {result.throughput:.1f} ops/sec")
-    print(f"      GET Avg: {statistics.mean(result.latencies_get) if result.latencies_get else 0:.3f}ms")
-    print(f"      SET Avg: {statistics.mean(result.latencies_set) if result.latencies_set else 0:.3f}ms")
+    print(f"      GET Avg: {mean_latency(result.latencies_get):.3f}ms")
+    print(f"      SET Avg: {mean_latency(result.latencies_set):.3f}ms")
     print("-" * 60)
     return result
 
 def plot_comparison(results: List[BenchmarkResult], output_dir: str):
-    if not HAS_DEPS:
-        print("⚠️  Skipping plot generation: numpy/pandas/matplotlib/seaborn not found.")
+    if not HAS_PLOTTING:
+        print("⚠️  Skipping plot generation: pandas/matplotlib/seaborn not found.")
         return
 
     if not results:
@@ -274,63 +695,88 @@ def plot_comparison(results: List[BenchmarkResult], output_dir: str):
     
     # 2. Latency Distribution (Combined)
     plt.figure(figsize=(12, 6))
-    lat_data = []
+    rng = np.random.default_rng()
+    servers, types, lats = [], [], []
     for r in results:
-        # Sample GET latencies
-        gets = r.latencies_get if len(r.latencies_get) < 5000 else random.sample(r.latencies_get, 5000)
-        for l in gets: lat_data.append({"Server": r.config.name, "Type": "GET", "Latency": l})
-        
-        # Sample SET latencies
-        sets = r.latencies_set if len(r.latencies_set) < 5000 else random.sample(r.latencies_set, 5000)
-        for l in sets: lat_data.append({"Server": r.config.name, "Type": "SET", "Latency": l})
+        # Sample up to 5000 latencies per operation type
+        for op, arr in (("GET", r.latencies_get), ("SET", r.latencies_set)):
+            sample = arr if len(arr) < 5000 else rng.choice(arr, 5000, replace=False)
+            servers.append(np.full(len(sample), r.config.name, dtype=object))
+            types.append(np.full(len(sample), op, dtype=object))
+            lats.append(sample)
             
-    df_lat = pd.DataFrame(lat_data)
+    df_lat = pd.DataFrame({"Server": np.concatenate(servers), "Type": np.concatenate(types),
+                           "Latency": np.concatenate(lats)})
     sns.boxplot(data=df_lat, x="Type", y="Latency", hue="Server", palette="viridis", showfliers=False)
     plt.title("Latency Distribution by Operation Type (Lower is Better)")
     plt.ylabel("Latency (ms)")
     plt.savefig(f"{output_dir}/real_world_latency.png")
     plt.close()
 
+def dump_record(record: Dict[str, Any]) -> bytes:
+    # One JSON Lines record (orjson when installed)
+    if orjson:
+        return orjson.dumps(record) + b"\n"
+    return json.dumps(record).encode('utf-8') + b"\n"
+
+def load_results(filename: str) -> List[Dict[str, Any]]:
+    # Results are JSON Lines; files written by older versions hold one JSON array
+    with open(filename, 'rb') as f:
+        content = f.read()
+    if content.lstrip().startswith(b'['):
+        return json.loads(content)
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+def migrate_legacy_results(filename: str):
+    # Convert a JSON array results file (this file, or <name>.json next to a
+    # .jsonl target) to JSON Lines so new records can simply be appended
+    legacy = os.path.splitext(filename)[0] + ".json"
+    source = filename if os.path.exists(filename) else legacy
+    if not os.path.exists(source):
+        return
+    try:
+        with open(source, 'rb') as f:
+            if not f.read(64).lstrip().startswith(b'['): return
+        data = load_results(source)
+    except:
+        return
+    with open(filename, 'wb') as f:
+        for item in data:
+            f.write(dump_record(item))
+    print(f"   📦 Converted {source} to JSON Lines ({filename})")
+
 def save_results_json(results: List[BenchmarkResult], filename: str):
-    data = []
-    if os.path.exists(filename):
-        try:
-            with open(filename, 'r') as f:
-                data = json.load(f)
-        except:
-            pass
-            
-    for r in results:
-        # Remove existing entry for this server if present to avoid duplicates
-        data = [d for d in data if d['name'] != r.config.name]
-        
-        data.append({
-            "name": r.config.name,
-            "throughput": r.throughput,
-            "avg_latency_get": statistics.mean(r.latencies_get) if r.latencies_get else 0,
-            "avg_latency_set": statistics.mean(r.latencies_set) if r.latencies_set else 0,
-            "p99_latency_get": statistics.quantiles(r.latencies_get, n=100)[98] if len(r.latencies_get) >= 100 else 0,
-            "p99_latency_set": statistics.quantiles(r.latencies_set, n=100)[98] if len(r.latencies_set) >= 100 else 0
-        })
-        
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=2)
+    # Append-only: the report reads the latest record per server
+    migrate_legacy_results(filename)
+    with open(filename, 'ab') as f:
+        for r in results:
+            f.write(dump_record({
+                "name": r.config.name,
+                "throughput": r.throughput,
+                "avg_latency_get": mean_latency(r.latencies_get),
+                "avg_latency_set": mean_latency(r.latencies_set),
+                "p99_latency_get": p99_latency(r.latencies_get),
+                "p99_latency_set": p99_latency(r.latencies_set)
+            }))
     print(f"   💾 Results saved to {filename}")
 
 def generate_markdown_table(json_file: str):
+    # Until a run migrates it, older results are still in the <name>.json array file
+    if not os.path.exists(json_file):
+        json_file = os.path.splitext(json_file)[0] + ".json"
     if not os.path.exists(json_file):
         print("No results file found.")
         return
 
-    with open(json_file, 'r') as f:
-        data = json.load(f)
+    # Latest record per server
+    latest = {d['name']: d for d in load_results(json_file)}
 
     print("\n### Real-World Scenario Results\n")
     print("| Metric | Redis | Ignix | Ratio (Ignix/Redis) |")
     print("|--------|-------|-------|----------------------|")
 
-    redis_res = next((d for d in data if d['name'] == 'Redis'), None)
-    ignix_res = next((d for d in data if d['name'] == 'Ignix'), None)
+    redis_res = latest.get('Redis')
+    ignix_res = latest.get('Ignix')
     
     if not redis_res or not ignix_res:
         print("Waiting for both results...")
@@ -355,13 +801,26 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--out", default="real_world_results")
     parser.add_argument("--target", choices=["all", "redis", "ignix"], default="all")
-    parser.add_argument("--json-out", default="real_world_results.json")
+    parser.add_argument("--json-out", default="real_world_results.jsonl", help="Results file (JSON Lines, appended to)")
     parser.add_argument("--report-only", action="store_true")
+    parser.add_argument("--pipeline-depth", type=int, default=1,
+                        help="Commands sent per write on each connection (1 disables pipelining)")
+    parser.add_argument("--driver", choices=["asyncio", "threads"], default="asyncio",
+                        help="asyncio: all connections on one event loop; threads: one thread per connection")
+    parser.add_argument("--uvloop", action="store_true", help="Run the asyncio driver on uvloop")
+    parser.add_argument("--client-procs", type=int, default=1,
+                        help="Spread the connections over this many client processes, each pinned to one core")
     args = parser.parse_args()
     
     if args.report_only:
         generate_markdown_table(args.json_out)
         return
+
+    # Forked pre-fill and client processes inherit the compiled encoder
+    load_resp_encoder()
+    if args.uvloop and uvloop is None:
+        print("⚠️  uvloop not installed (pip install uvloop), using the default event loop")
+        args.uvloop = False
     
     # Scenario: Session Store
     # 100k keys, 100k ops, 50 conns, 80% read, Zipf 1.2, 1KB-2KB values
@@ -372,7 +831,11 @@ def main():
         "read_ratio": 0.8,
         "zipf_param": 1.2,
         "value_size_min": 1024,
-        "value_size_max": 2048
+        "value_size_max": 2048,
+        "pipeline_depth": args.pipeline_depth,
+        "driver": args.driver,
+        "client_procs": args.client_procs,
+        "uvloop": args.uvloop
     }
     
     configs = []
@@ -381,13 +844,22 @@ def main():
     if args.target in ["all", "ignix"]:
         configs.append(WorkloadConfig(host="localhost", port=7379, name="Ignix", **common_config))
     
+    # The threads driver shares one pool across scenarios
+    executor = None
+    if args.driver == "threads" and args.client_procs <= 1 and configs:
+        executor = ThreadPoolExecutor(max_workers=max(c.connections for c in configs))
+    
     results = []
-    for conf in configs:
-        try:
-            res = benchmark(conf)
-            results.append(res)
-        except Exception as e:
-            print(f"❌ Failed {conf.name}: {e}")
+    try:
+        for conf in configs:
+            try:
+                res = benchmark(conf, executor)
+                results.append(res)
+            except Exception as e:
+                print(f"❌ Failed {conf.name}: {e}")
+    finally:
+        if executor:
+            executor.shutdown()
             
     if args.json_out:
         save_results_json(results, args.json_out)
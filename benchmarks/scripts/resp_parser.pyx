@@ -0,0 +1,63 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""Compiled RESP reply parser for basic_benchmark.py
+
+Mirrors RedisProtocolClient._read_response, reading from the client's
+buffered socket reader; bulk payloads are read into the client's scratch
+buffer, as _read_exact does. basic_benchmark.py builds it through pyximport
+for raw-client runs and falls back to the pure-Python parser when Cython is
+not installed.
+"""
+
+from cpython.bytearray cimport PyByteArray_AS_STRING
+from cpython.bytes cimport PyBytes_FromStringAndSize
+
+
+cdef bytes read_line(object rfile):
+    """Read line ending with \\r\\n"""
+    cdef bytes line = rfile.readline()
+    cdef Py_ssize_t n = len(line)
+    if n < 2 or line[n - 2] != 13 or line[n - 1] != 10:
+        raise Exception("Connection closed")
+    return line[:n - 2]
+
+
+cdef bytes read_bulk(object rfile, bytearray buf, Py_ssize_t length):
+    """Read a bulk payload of `length` bytes plus its trailing \\r\\n via `buf`"""
+    cdef Py_ssize_t n = length + 2
+    cdef Py_ssize_t got = 0
+    cdef Py_ssize_t read
+    if len(buf) < n:
+        buf.extend(bytes(n - len(buf)))  # grown in place, so the client keeps it
+    mv = memoryview(buf)
+    while got < n:
+        read = rfile.readinto(mv[got:n])
+        if not read:
+            raise Exception("Connection closed")
+        got += read
+    mv.release()
+    return PyBytes_FromStringAndSize(PyByteArray_AS_STRING(buf), length)
+
+
+def read_response(object rfile, bytearray buf):
+    """Read RESP response; `buf` is the client's scratch buffer for bulk payloads"""
+    cdef bytes first = rfile.read(1)
+    cdef bytes line
+    cdef Py_ssize_t length
+    cdef unsigned char first_char
+
+    if not first:
+        raise Exception("Connection closed")
+    first_char = first[0]
+
+    if first_char == b'+' or first_char == b':':  # Simple string / Integer
+        return read_line(rfile)
+    elif first_char == b'-':  # Error
+        line = read_line(rfile)
+        raise Exception(f"Server error: {line.decode('utf-8')}")
+    elif first_char == b'$':  # Bulk string
+        length = int(read_line(rfile))
+        if length == -1:  # Null
+            return b''
+        return read_bulk(rfile, buf, length)
+    else:
+        raise Exception(f"Unknown response type: {first}")
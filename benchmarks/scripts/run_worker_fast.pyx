@@ -0,0 +1,119 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""Compiled load loop for comprehensive_benchmark.py
+
+Mirrors run_worker on an already connected, blocking socket: requests are
+written with writev() straight from the pre-encoded frames and replies are
+parsed from a private read buffer, all with the GIL released. Only the
+reply types SET and GET produce are understood (simple strings, errors,
+integers and bulk strings). comprehensive_benchmark.py builds it through
+pyximport when the "compiled" driver is chosen and refuses it without Cython.
+"""
+
+from cpython.bytes cimport PyBytes_AS_STRING, PyBytes_GET_SIZE
+from libc.stdlib cimport malloc, free
+
+include "raw_io.pxi"
+
+
+cdef int read_reply(Reader* r, bint is_set) nogil:
+    """1 if the reply means success, 0 if not, -1 if the stream is unusable"""
+    cdef Py_ssize_t n = read_line(r)
+    cdef char* line
+    cdef char kind
+    cdef long length
+    if n < 3:
+        return -1
+    line = r.buf + r.start
+    kind = line[0]
+    r.start += n
+
+    if kind == b'+':
+        return 1 if not is_set or (n == 5 and line[1] == b'O' and line[2] == b'K') else 0
+    elif kind == b'-':
+        return 0
+    elif kind == b':':
+        return 0 if is_set else 1
+    elif kind == b'$':
+        length = parse_int(line + 1, n - 3)
+        if length >= 0 and not skip(r, length + 2):
+            return -1
+        return 0 if is_set else 1
+    return -1
+
+
+def run_worker_fast(int fd, list heads, bytes tail, bint is_set,
+                    Py_ssize_t ops, Py_ssize_t depth, Py_ssize_t sample_every,
+                    long long[::1] out):
+    """Run `ops` requests on `fd` in pipelined groups of `depth`
+
+    Op i sends heads[i % len(heads)] followed by `tail`. The latency (ns) of
+    every `sample_every`-th successful op is stored in `out`, which must hold
+    `ops` values; a `sample_every` of 0 records none. Returns (samples stored,
+    errors, successful ops).
+    """
+    cdef Py_ssize_t num_heads = len(heads)
+    cdef Py_ssize_t tail_len = PyBytes_GET_SIZE(tail)
+    cdef char* tail_ptr = PyBytes_AS_STRING(tail)
+    cdef char** head_ptr = <char**>malloc(num_heads * sizeof(char*))
+    cdef Py_ssize_t* head_len = <Py_ssize_t*>malloc(num_heads * sizeof(Py_ssize_t))
+    cdef iovec* iov = <iovec*>malloc(2 * depth * sizeof(iovec))
+    cdef Reader r
+    cdef Py_ssize_t i, j, k, start, end
+    cdef Py_ssize_t sampled = 0, errors = 0, completed = 0
+    cdef int status
+    cdef long long t0
+
+    r.fd = fd
+    r.buf = <char*>malloc(BUF_SIZE)
+    r.start = r.end = 0
+    try:
+        if head_ptr == NULL or head_len == NULL or iov == NULL or r.buf == NULL:
+            raise MemoryError()
+        for j in range(num_heads):
+            head_ptr[j] = PyBytes_AS_STRING(heads[j])
+            head_len[j] = PyBytes_GET_SIZE(heads[j])
+
+        with nogil:
+            start = 0
+            while start < ops:
+                end = start + depth if start + depth < ops else ops
+                k = 0
+                for i in range(start, end):
+                    j = i % num_heads
+                    iov[k].iov_base = head_ptr[j]
+                    iov[k].iov_len = head_len[j]
+                    k += 1
+                    if tail_len:
+                        iov[k].iov_base = tail_ptr
+                        iov[k].iov_len = tail_len
+                        k += 1
+
+                # Each op's latency runs from the batch write to its own reply
+                t0 = now_ns()
+                if not send_all(fd, iov, <int>k):
+                    errors += ops - start
+                    break
+
+                for i in range(start, end):
+                    status = read_reply(&r, is_set)
+                    if status < 0:
+                        break
+                    if status:
+                        completed += 1
+                        if sample_every and i % sample_every == 0:
+                            out[sampled] = now_ns() - t0
+                            sampled += 1
+                    else:
+                        errors += 1
+                if status < 0:
+                    # Connection lost or out of sync: the rest cannot succeed
+                    errors += ops - i
+                    break
+                start = end
+    finally:
+        free(head_ptr)
+        free(head_len)
+        free(iov)
+        free(r.buf)
+
+    return sampled, errors, completed
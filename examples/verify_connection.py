@@ -7,68 +7,208 @@ connecting to the Ignix server and not to another Redis instance.
 """
 
 import socket
+import subprocess
 import sys
 import time
 import os
+from datetime import datetime
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# TCP_QUICKACK is Linux-only and one-shot, so it is re-armed after every recv
+TCP_QUICKACK = getattr(socket, 'TCP_QUICKACK', None)
+SOCKET_BUFFER_SIZE = 1 << 20
 
 class IgnixVerificationClient:
     def __init__(self, host='localhost', port=7379):
         self.host = host
         self.port = port
         self.socket = None
+        # Received bytes not yet parsed start at _pos
+        self._buf = bytearray()
+        self._pos = 0
+        self._chunk = memoryview(bytearray(1 << 16))
     
     def connect(self):
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            # Set before connect() so the receive window is scaled to match
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
             self.socket.settimeout(5)
             self.socket.connect((self.host, self.port))
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
             return True
         except Exception as e:
             print(f"❌ Connection failed: {e}")
             return False
     
     def disconnect(self):
+        del self._buf[:]
+        self._pos = 0
         if self.socket:
             self.socket.close()
             self.socket = None
     
+    @staticmethod
+    def _encode(*args):
+        command = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            arg_bytes = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            command += (f"${len(arg_bytes)}\r\n".encode(), arg_bytes, b"\r\n")
+        return b"".join(command)
+    
     def send_command(self, *args):
         if not self.socket:
             raise Exception("Not connected")
         
-        command = f"*{len(args)}\r\n"
-        for arg in args:
-            arg_str = str(arg)
-            command += f"${len(arg_str)}\r\n{arg_str}\r\n"
-        
-        self.socket.send(command.encode('utf-8'))
+        self.socket.sendall(self._encode(*args))
         return self._read_response()
     
-    def _read_response(self):
-        response = b""
-        while True:
-            data = self.socket.recv(1024)
-            if not data:
-                break
-            response += data
-            if response.endswith(b'\r\n'):
-                break
+    def pipeline(self, *commands):
+        """Send all commands in one write and return their replies in order"""
+        if not self.socket:
+            raise Exception("Not connected")
         
-        response_str = response.decode('utf-8')
+        self.socket.sendall(b"".join(self._encode(*command) for command in commands))
+        return [self._read_response() for _ in commands]
+    
+    def _fill(self):
+        """Append the next chunk from the socket to the receive buffer"""
+        if self._pos:
+            del self._buf[:self._pos]
+            self._pos = 0
+        n = self.socket.recv_into(self._chunk)
+        if not n:
+            raise Exception("Connection closed")
+        if TCP_QUICKACK is not None:
+            self.socket.setsockopt(socket.IPPROTO_TCP, TCP_QUICKACK, 1)
+        self._buf += self._chunk[:n]
+    
+    def _read_line(self):
+        while True:
+            end = self._buf.find(b'\r\n', self._pos)
+            if end >= 0:
+                line = bytes(self._buf[self._pos:end])
+                self._pos = end + 2
+                return line
+            self._fill()
+    
+    def _read_bulk(self, length):
+        """Consume a bulk payload and its \\r\\n, slicing out only the payload"""
+        while len(self._buf) - self._pos < length + 2:
+            self._fill()
+        start = self._pos
+        self._pos += length + 2
+        return bytes(self._buf[start:start + length])
+    
+    def _read_response(self):
+        # Replies stay bytes: framing is ASCII and bulk payloads are opaque
+        line = self._read_line()
+        kind = line[:1]
         
-        if response_str.startswith('+'):
-            return response_str[1:].rstrip('\r\n')
-        elif response_str.startswith(':'):
-            return int(response_str[1:].rstrip('\r\n'))
-        elif response_str.startswith('$'):
-            lines = response_str.split('\r\n')
-            if lines[0] == '$-1':
+        if kind == b'+':
+            return line[1:]
+        elif kind == b':':
+            return int(line[1:])
+        elif kind == b'$':
+            length = int(line[1:])
+            if length < 0:
                 return None
-            return lines[1] if len(lines) > 1 else ""
-        elif response_str.startswith('-'):
-            return response_str[1:].rstrip('\r\n')
+            # Bulk payloads may contain \r\n, so read by the declared length
+            return self._read_bulk(length)
+        elif kind == b'-':
+            return line[1:]
         else:
-            return response_str.rstrip('\r\n')
+            return line
+
+def find_ignix_processes():
+    """(pid, command line) of running release Ignix binaries, via psutil or /proc"""
+    if psutil:
+        procs = []
+        for proc in psutil.process_iter(['pid', 'cmdline']):
+            cmdline = ' '.join(proc.info['cmdline'] or [])
+            if 'target/release/ignix' in cmdline:
+                procs.append((proc.info['pid'], cmdline))
+        return procs
+    
+    procs = []
+    for entry in os.scandir('/proc'):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry.name}/cmdline', 'rb') as f:
+                cmdline = f.read().replace(b'\0', b' ').decode(errors='replace').strip()
+        except OSError:
+            continue
+        if 'target/release/ignix' in cmdline:
+            procs.append((int(entry.name), cmdline))
+    return procs
+
+def find_listeners(port):
+    """(pid, process name) for each socket listening on `port`; unknown owners are (None, '?')"""
+    if psutil:
+        listeners = []
+        for conn in psutil.net_connections(kind='tcp'):
+            if conn.status == psutil.CONN_LISTEN and conn.laddr and conn.laddr.port == port:
+                try:
+                    name = psutil.Process(conn.pid).name() if conn.pid else '?'
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    name = '?'
+                listeners.append((conn.pid, name))
+        return listeners
+    
+    # Local address is HOST:PORT in hex, state 0A is LISTEN, field 9 the socket inode
+    hex_port = f"{port:04X}"
+    inodes = set()
+    tables = 0
+    for path in ('/proc/net/tcp', '/proc/net/tcp6'):
+        try:
+            with open(path) as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    if fields[3] == '0A' and fields[1].rsplit(':', 1)[1] == hex_port:
+                        inodes.add(f"socket:[{fields[9]}]")
+            tables += 1
+        except OSError:
+            continue
+    
+    if not tables:
+        # No /proc (macOS, BSD): ask lsof; a missing lsof raises and is reported by the caller
+        return find_listeners_lsof(port)
+    
+    owners = {}
+    if inodes:
+        for entry in os.scandir('/proc'):
+            if not entry.name.isdigit():
+                continue
+            try:
+                for fd in os.scandir(f'/proc/{entry.name}/fd'):
+                    link = os.readlink(fd.path)
+                    if link in inodes and link not in owners:
+                        with open(f'/proc/{entry.name}/comm') as f:
+                            owners[link] = (int(entry.name), f.read().strip())
+            except OSError:
+                continue
+    return [owners.get(inode, (None, '?')) for inode in inodes]
+
+def find_listeners_lsof(port):
+    """find_listeners via `lsof -F pc`, which prints a p<pid> line then a c<command> line per process"""
+    result = subprocess.run(['lsof', '-nP', f'-iTCP:{port}', '-sTCP:LISTEN', '-Fpc'],
+                            capture_output=True, text=True)
+    listeners = []
+    pid = None
+    for line in result.stdout.splitlines():
+        if line.startswith('p'):
+            pid = int(line[1:])
+        elif line.startswith('c'):
+            listeners.append((pid, line[1:]))
+    return listeners
 
 def verify_ignix_connection():
     print("🔍 Ignix Connection Verification")
@@ -79,14 +219,12 @@ def verify_ignix_connection():
     print("-" * 25)
     
     try:
-        import subprocess
-        result = subprocess.run(['ps', 'aux'], capture_output=True, text=True)
-        ignix_processes = [line for line in result.stdout.split('\n') if 'ignix' in line and 'target/release/ignix' in line]
+        ignix_processes = find_ignix_processes()
         
         if ignix_processes:
             print("✅ Ignix process found:")
-            for process in ignix_processes:
-                print(f"   {process.strip()}")
+            for pid, cmdline in ignix_processes:
+                print(f"   {pid} {cmdline}")
         else:
             print("❌ No Ignix process found")
             print("   Start Ignix: cargo run --release")
@@ -99,12 +237,11 @@ def verify_ignix_connection():
     print("-" * 20)
     
     try:
-        result = subprocess.run(['lsof', '-i', ':7379'], capture_output=True, text=True)
-        if result.stdout:
+        listeners = find_listeners(7379)
+        if listeners:
             print("✅ Port 7379 is listening:")
-            for line in result.stdout.strip().split('\n'):
-                if 'ignix' in line:
-                    print(f"   {line}")
+            for pid, name in listeners:
+                print(f"   {name} (pid {pid})" if pid else "   owner not visible to this user")
         else:
             print("❌ Port 7379 is not listening")
             return False
@@ -116,16 +253,19 @@ def verify_ignix_connection():
     print("-" * 25)
     
     aof_file = "ignix.aof"
-    if os.path.exists(aof_file):
+    try:
         stat = os.stat(aof_file)
-        mod_time = time.ctime(stat.st_mtime)
-        size = stat.st_size
+    except FileNotFoundError:
+        stat = None
+    
+    if stat:
+        mod_time = datetime.fromtimestamp(stat.st_mtime_ns / 1e9).isoformat()
         print(f"✅ AOF file exists: {aof_file}")
-        print(f"   Size: {size} bytes")
+        print(f"   Size: {stat.st_size} bytes")
         print(f"   Modified: {mod_time}")
         
         # Check if file was modified recently (within last 5 minutes)
-        if time.time() - stat.st_mtime < 300:
+        if time.time_ns() - stat.st_mtime_ns < 300 * 10**9:
             print("✅ AOF file recently modified (Ignix is active)")
         else:
             print("⚠️  AOF file not recently modified")
@@ -144,34 +284,38 @@ def verify_ignix_connection():
         
         print("✅ Connected to server on port 7379")
         
-        # Test PING
-        response = client.send_command("PING")
-        print(f"✅ PING response: {response}")
-        
-        # Set a unique test key
+        # PING, set a unique test key, read it back and clean it up,
+        # all in one round trip
         test_key = f"ignix_test_{int(time.time())}"
-        test_value = "ignix_verification_value"
+        test_value = b"ignix_verification_value"
         
-        response = client.send_command("SET", test_key, test_value)
-        print(f"✅ SET {test_key}: {response}")
+        pong, set_reply, response, _ = client.pipeline(
+            ("PING",),
+            ("SET", test_key, test_value),
+            ("GET", test_key),
+            ("DEL", test_key),
+        )
+        print(f"✅ PING response: {pong.decode()}")
+        print(f"✅ SET {test_key}: {set_reply.decode()}")
         
         # Verify the value was set
-        response = client.send_command("GET", test_key)
         if response == test_value:
-            print(f"✅ GET {test_key}: {response} (matches expected)")
+            print(f"✅ GET {test_key}: {response.decode()} (matches expected)")
         else:
-            print(f"❌ GET {test_key}: {response} (does not match expected)")
-        
-        # Clean up test key
-        client.send_command("DEL", test_key)
+            print(f"❌ GET {test_key}: {response!r} (does not match expected)")
         
         print("\n5️⃣  AOF File Update Check:")
         print("-" * 25)
         
-        # Check if AOF file was updated after our operation
-        if os.path.exists(aof_file):
+        # Check if AOF file was updated after our operation; nanosecond
+        # mtimes catch writes within the same second as the first stat
+        try:
             new_stat = os.stat(aof_file)
-            if new_stat.st_mtime > stat.st_mtime:
+        except FileNotFoundError:
+            new_stat = None
+        
+        if new_stat:
+            if stat is None or new_stat.st_mtime_ns > stat.st_mtime_ns:
                 print("✅ AOF file updated after our operation")
                 print("✅ This confirms we're connected to Ignix!")
             else: